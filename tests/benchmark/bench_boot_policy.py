@@ -0,0 +1,91 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of building and comparing SAN-heavy boot policy trees.
+
+Run with:
+    python -m tests.benchmark.bench_boot_policy
+
+The time per policy should stay flat as the sizes grow, i.e. the total
+time scales linearly. The child lookups are timed against a parent which
+is built once per size: the indexed lookup should stay flat while the
+plain scan of parent.child grows with the number of children.
+"""
+import timeit
+
+from ucsmsdk.mometa.lsboot.LsbootPolicy import LsbootPolicy
+from ucsmsdk.mometa.lsboot.LsbootSan import LsbootSan
+
+from ucsm_apis.server.boot import _boot_policy_device_diff
+from ucsm_apis.server.boot import _boot_policy_expected_get
+from ucsm_apis.server.boot import _children_get
+
+_san_devices = [
+    {"device_name": "san", "device_order": "1", "vnic_name": "fc0",
+     "type": "primary", "target_type": "primary", "lun": "1",
+     "wwn": "20:00:00:00:00:00:00:01"},
+    {"device_name": "san", "device_order": "1", "vnic_name": "fc0",
+     "type": "primary", "target_type": "secondary", "lun": "1",
+     "wwn": "20:00:00:00:00:00:00:02"},
+    {"device_name": "san", "device_order": "1", "vnic_name": "fc1",
+     "type": "secondary", "target_type": "primary", "lun": "1",
+     "wwn": "20:00:00:00:00:00:00:03"},
+    {"device_name": "san", "device_order": "1", "vnic_name": "fc1",
+     "type": "secondary", "target_type": "secondary", "lun": "1",
+     "wwn": "20:00:00:00:00:00:00:04"},
+    {"device_name": "lan", "device_order": "2", "vnic_name": "eth0"},
+    {"device_name": "lan", "device_order": "2", "vnic_name": "eth1"},
+    {"device_name": "cd_dvd", "device_order": "3"},
+]
+
+
+def _build_and_compare(count):
+    for i in range(count):
+        name = "san%d" % i
+        existing = _boot_policy_expected_get(name, "org-root", _san_devices)
+        expected = _boot_policy_expected_get(name, "org-root", _san_devices)
+        _boot_policy_device_diff(existing, expected)
+
+
+def _wide_parent_get(count):
+    parent = LsbootPolicy(parent_mo_or_dn="org-root", name="wide")
+    for i in range(count):
+        LsbootSan(parent_mo_or_dn=parent, order="1")
+    return parent
+
+
+def _children_scan(parent_mo, class_id):
+    return [mo for mo in parent_mo.child if mo.get_class_id() == class_id]
+
+
+def _report(title, func, sizes, unit):
+    print(title)
+    for size in sizes:
+        elapsed = min(timeit.repeat(lambda: func(size), number=1, repeat=3))
+        print("  %6d %s: %8.2f ms total, %8.2f us per %s" %
+              (size, unit, elapsed * 1e3, elapsed * 1e6 / size, unit))
+
+
+if __name__ == "__main__":
+    _report("build and compare SAN boot policies", _build_and_compare,
+            [50, 100, 200, 400], "policy")
+
+    print("child lookups on a wide parent")
+    for size in [500, 1000, 2000, 4000]:
+        parent = _wide_parent_get(size)
+        for name, lookup in [("plain scan", _children_scan),
+                             ("_children_get", _children_get)]:
+            elapsed = min(timeit.repeat(
+                lambda: lookup(parent, "LsbootLan"), number=100, repeat=3))
+            print("  %6d children, %-14s %8.2f us per lookup" %
+                  (size, name + ":", elapsed * 1e4))
@@ -0,0 +1,96 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of the mometa class resolution overhead per API call.
+
+Run with:
+    python -m tests.benchmark.bench_mometa
+
+The first table compares resolving one class the way the APIs used to,
+a function-local import or load_class(), with the registry. The second
+one times user_create and boot_policy_order_set end to end against a
+handle which does not talk to UCSM, once with mo_class_get patched to
+call load_class() on every lookup (the baseline) and once as shipped.
+"""
+import logging
+import timeit
+
+from mock import Mock, patch
+from ucsmsdk.ucscoreutils import load_class
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk.ucsxmlcodec import from_xml_str
+
+from ucsm_apis.admin.user import user_create
+from ucsm_apis.server.boot import boot_policy_order_set
+from ucsm_apis.utils.mometa import mo_class_get
+
+_number = 20000
+
+_devices = [{"device_name": "lan", "device_order": "1", "vnic_name": "eth0"},
+            {"device_name": "lan", "device_order": "1", "vnic_name": "eth1"},
+            {"device_name": "cd_dvd", "device_order": "2"},
+            {"device_name": "local_lun", "device_order": "3",
+             "lun_name": "boot", "type": "primary"}]
+
+_bp_xml = (
+    '<lsbootPolicy dn="org-root/boot-policy-bench" name="bench">'
+    '<lsbootVirtualMedia dn="org-root/boot-policy-bench/read-only-vm" '
+    'access="read-only" order="2"/>'
+    '</lsbootPolicy>')
+
+
+def _local_import():
+    from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+    return AaaUser
+
+
+def _handle_get():
+    handle = UcsHandle("192.168.1.1", "admin", "password")
+    handle.commit = lambda *args, **kwargs: handle.commit_buffer_discard()
+
+    def _query_dn(dn, hierarchy=False, need_response=False):
+        response = Mock()
+        response.out_configs.child = [from_xml_str(_bp_xml)]
+        return response
+    handle.query_dn = _query_dn
+    return handle
+
+
+def _report(title, funcs, number):
+    print(title)
+    for name, func in funcs:
+        elapsed = min(timeit.repeat(func, number=number, repeat=3))
+        print("  %-28s %8.2f us per call" % (name, elapsed * 1e6 / number))
+
+
+if __name__ == "__main__":
+    logging.getLogger("ucs").setLevel(logging.WARNING)
+
+    _report("class resolution", [
+        ("function-local import", _local_import),
+        ("load_class", lambda: load_class("AaaUser")),
+        ("mo_class_get", lambda: mo_class_get("AaaUser")),
+    ], _number)
+
+    handle = _handle_get()
+    api_calls = [
+        # pwd_life_time is unknown to some ucsmsdk releases
+        ("user_create", lambda: user_create(handle, name="bench",
+                                            pwd_life_time=None)),
+        ("boot_policy_order_set",
+         lambda: boot_policy_order_set(handle, "bench", _devices)),
+    ]
+    with patch("ucsm_apis.admin.user.mo_class_get", load_class), \
+            patch("ucsm_apis.server.boot.mo_class_get", load_class):
+        _report("API calls, load_class per lookup (before)", api_calls, 200)
+    _report("API calls, mo_class_get (after)", api_calls, 200)
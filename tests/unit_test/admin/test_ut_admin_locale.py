@@ -0,0 +1,79 @@
+from mock import patch
+from nose.tools import assert_equal
+
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk.ucsexception import UcsException
+
+from ucsm_apis.admin.locale import *
+
+handle = UcsHandle("10.10.10.10", "username", "password")
+
+
+def _mos(xml_strs):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    return [from_xml_str(xml_str) for xml_str in xml_strs]
+
+
+def _class_mos():
+    return {
+        "AaaLocale": _mos(['<aaaLocale dn="sys/user-ext/locale-emea" '
+                           'name="emea"/>']),
+        "OrgOrg": _mos(['<orgOrg dn="org-root" name="root"/>'] +
+                       ['<orgOrg dn="org-root/org-org%d" name="org%d"/>'
+                        % (index, index) for index in range(3)]),
+    }
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'query_classids')
+def test_locale_org_assign_bulk(mock_query_classids, mock_query_dn,
+                                mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classids.return_value = _class_mos()
+
+    assignments = [{"locale_name": "emea", "name": "org%d" % index,
+                    "org_dn": "org-root/org-org%d" % index}
+                   for index in range(3)]
+    assignments.append({"locale_name": "emea", "name": "missing",
+                        "org_dn": "org-root/org-missing"})
+    assignments.append({"locale_name": "apac", "name": "root"})
+
+    result = locale_org_assign_bulk(handle, assignments)
+
+    assert_equal(mock_query_classids.call_count, 1)
+    assert not mock_query_dn.called
+    assert_equal(mock_commit.call_count, 1)
+    assert_equal(result["success"],
+                 ["sys/user-ext/locale-emea/org-org%d" % index
+                  for index in range(3)])
+    assert_equal(sorted(result["failed"]),
+                 ["sys/user-ext/locale-apac/org-root",
+                  "sys/user-ext/locale-emea/org-missing"])
+    assert_equal(len(handle._get_commit_buf()), 3)
+    handle.commit_buffer_discard()
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_locale_org_unassign_bulk(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _mos(
+        ['<aaaOrg dn="sys/user-ext/locale-emea/org-org%d" name="org%d" '
+         'orgDn="org-root/org-org%d"/>' % (index, index, index)
+         for index in range(2)])
+    mock_commit.side_effect = UcsException(103, "failed")
+
+    result = locale_org_unassign_bulk(
+        handle, [{"locale_name": "emea", "name": "org0"},
+                 {"locale_name": "emea", "name": "org1"},
+                 {"locale_name": "emea", "name": "org2"}])
+
+    assert_equal(mock_query_classid.call_count, 1)
+    assert_equal(mock_commit.call_count, 1)
+    assert_equal(result["success"], [])
+    assert_equal(sorted(result["failed"]),
+                 ["sys/user-ext/locale-emea/org-org%d" % index
+                  for index in range(3)])
+    assert_equal(handle._get_commit_buf(), {})
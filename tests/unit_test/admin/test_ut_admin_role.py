@@ -0,0 +1,78 @@
+from mock import patch
+from nose.tools import assert_equal
+
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk.ucsexception import UcsException
+
+from ucsm_apis.admin.role import *
+
+handle = UcsHandle("10.10.10.10", "username", "password")
+
+
+def _roles_mo():
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    return [from_xml_str(
+        '<aaaRole dn="sys/user-ext/role-%s" name="%s" priv="%s"/>' % role)
+        for role in [("admin", "admin", "admin"),
+                     ("ops", "ops", "ls-server,ls-network,fault"),
+                     ("net", "net", "ls-network"),
+                     ("legacy", "legacy", "read-only")]]
+
+
+_desired_roles = [
+    {"name": "ops", "priv": ["fault", "ls-network", "ls-server", "fault"]},
+    {"name": "net", "priv": "ls-network,ls-qos"},
+    {"name": "auditor", "priv": "read-only,fault", "descr": "audit"},
+]
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_role_sync(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _roles_mo()
+
+    result = role_sync(handle, _desired_roles, dry_run=True)
+
+    assert_equal(mock_query_classid.call_count, 1)
+    assert not mock_commit.called
+    # priv order and duplicates do not matter
+    assert_equal(result["unchanged"], ["ops"])
+    assert_equal(result["modified"], ["net"])
+    assert_equal(result["created"], ["auditor"])
+    assert_equal(result["deleted"], [])
+
+    payload = result["dry_run"][0]
+    assert_equal(payload["mo_count"], 2)
+    assert 'priv="ls-network,ls-qos"' in payload["xml"]
+    assert 'priv="fault,read-only"' in payload["xml"]
+    assert "role-ops" not in payload["xml"]
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_role_sync_delete_extra(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _roles_mo()
+
+    result = role_sync(handle, _desired_roles[:1], delete_extra=True)
+
+    assert_equal(mock_commit.call_count, 1)
+    # predefined roles are kept
+    assert_equal(result["deleted"], ["legacy", "net"])
+    handle.commit_buffer_discard()
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_role_sync_no_change(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _roles_mo()
+    mock_commit.side_effect = UcsException(103, "failed")
+
+    result = role_sync(handle, _desired_roles[:1])
+
+    assert not mock_commit.called
+    assert_equal(result["unchanged"], ["ops"])
+    assert_equal(result["failed"], {})
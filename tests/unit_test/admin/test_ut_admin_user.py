@@ -0,0 +1,208 @@
+from mock import Mock, patch
+from nose.tools import assert_equal
+
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk.ucsexception import UcsException
+
+from ucsm_apis.admin.user import *
+
+handle = UcsHandle("10.10.10.10", "username", "password")
+
+
+def _users_response(xml_strs):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    response = Mock()
+    response.out_configs.child = [from_xml_str(xml_str)
+                                  for xml_str in xml_strs]
+    return response
+
+
+_existing_users_xml = [
+    '<aaaUser dn="sys/user-ext/user-admin" name="admin">'
+    '<aaaUserRole dn="sys/user-ext/user-admin/role-admin" name="admin"/>'
+    '</aaaUser>',
+    '<aaaUser dn="sys/user-ext/user-alice" name="alice" firstName="Alice" '
+    'accountStatus="active">'
+    '<aaaUserRole dn="sys/user-ext/user-alice/role-read-only" '
+    'name="read-only"/>'
+    '<aaaUserRole dn="sys/user-ext/user-alice/role-operations" '
+    'name="operations"/>'
+    '<aaaUserLocale dn="sys/user-ext/user-alice/locale-emea" name="emea"/>'
+    '</aaaUser>',
+    '<aaaUser dn="sys/user-ext/user-bob" name="bob" firstName="Bob">'
+    '<aaaUserRole dn="sys/user-ext/user-bob/role-read-only" '
+    'name="read-only"/>'
+    '</aaaUser>',
+    '<aaaUser dn="sys/user-ext/user-carol" name="carol">'
+    '</aaaUser>',
+]
+
+_desired_users = [
+    {"name": "alice", "first_name": "Alice", "pwd": "ignored",
+     "roles": "operations", "locales": ["emea"]},
+    {"name": "bob", "first_name": "Robert", "roles": ["admin"]},
+    {"name": "dave", "pwd": "p@ssw0rd", "pwd_life_time": None,
+     "roles": ["read-only", "storage"], "locales": "apac"},
+]
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_user_sync(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _users_response(_existing_users_xml)
+
+    result = user_sync(handle, _desired_users, delete_extra=True,
+                       dry_run=True)
+
+    # one read and no commit
+    assert_equal(mock_query_classid.call_count, 1)
+    assert not mock_commit.called
+    assert_equal(result["created"], ["dave"])
+    assert_equal(result["modified"], ["bob"])
+    assert_equal(result["deleted"], ["carol"])
+    assert_equal(result["unchanged"], ["alice"])
+    assert_equal(result["failed"], {})
+    assert_equal(len(result["dry_run"]), 1)
+
+    xml = result["dry_run"][0]["xml"]
+    assert 'dn="sys/user-ext/user-dave"' in xml
+    assert 'dn="sys/user-ext/user-dave/role-storage"' in xml
+    assert 'dn="sys/user-ext/user-dave/locale-apac"' in xml
+    assert 'firstName="Robert"' in xml
+    assert 'dn="sys/user-ext/user-bob/role-admin"' in xml
+    assert 'dn="sys/user-ext/user-carol"' in xml
+    # admin is protected, read-only is never removed
+    assert "user-admin" not in xml
+    assert "user-bob/role-read-only" not in xml
+    assert_equal(handle._get_commit_buf(), {})
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_user_sync_keeps_session_user(mock_query_classid, mock_commit):
+    session_handle = UcsHandle("10.10.10.10", "carol", "password")
+    mock_query_classid.return_value = _users_response(_existing_users_xml)
+
+    result = user_sync(session_handle, _desired_users[:1], delete_extra=True,
+                       dry_run=True)
+
+    # the session user is kept, deleting it would lock the sync out
+    assert_equal(result["deleted"], ["bob"])
+    assert "user-carol" not in result["dry_run"][0]["xml"]
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+def test_user_sync_batches(mock_query_classid, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classid.return_value = _users_response(_existing_users_xml)
+    mock_commit.side_effect = [None, UcsException(103, "failed")]
+
+    result = user_sync(handle, _desired_users, batch_size=2)
+
+    assert_equal(mock_commit.call_count, 2)
+    assert_equal(result["modified"], ["bob"])
+    assert_equal(result["unchanged"], ["alice"])
+    assert_equal(result["deleted"], [])
+    assert_equal(list(result["failed"]), ["dave"])
+    assert_equal(handle._get_commit_buf(), {})
+
+
+def _user_roles_mo():
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    return [from_xml_str(xml_str) for xml_str in [
+        '<aaaUserRole dn="sys/user-ext/user-alice/role-read-only" '
+        'name="read-only"/>',
+        '<aaaUserRole dn="sys/user-ext/user-alice/role-operations" '
+        'name="operations" descr="ops"/>',
+        '<aaaUserRole dn="sys/user-ext/user-bob/role-read-only" '
+        'name="read-only"/>',
+        '<aaaUserRole dn="sys/user-ext/remoteuser-bob/role-admin" '
+        'name="admin"/>',
+    ]]
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'query_children')
+def test_user_role_exists(mock_query_children, mock_query_dn):
+    mock_query_children.return_value = [
+        mo for mo in _user_roles_mo() if "/user-alice/" in mo.dn]
+
+    status, roles_mo = user_role_exists(handle, "alice",
+                                        "operations, read-only")
+    assert status
+    assert_equal([mo.name for mo in roles_mo], ["operations", "read-only"])
+    assert_equal(user_role_exists(handle, "alice", "operations,admin"),
+                 (False, None))
+    assert_equal(user_role_exists(handle, "alice", "operations",
+                                  descr="other"), (False, None))
+    # one query per call, never one per role
+    assert_equal(mock_query_children.call_count, 3)
+    assert not mock_query_dn.called
+
+
+@patch.object(UcsHandle, 'query_classid')
+def test_user_role_exists_bulk(mock_query_classid):
+    mock_query_classid.return_value = _user_roles_mo()
+
+    result = user_role_exists_bulk(handle, {"alice": "read-only,operations",
+                                            "bob": ["read-only", "admin"],
+                                            "carol": "read-only"})
+
+    assert_equal(mock_query_classid.call_count, 1)
+    assert result["alice"][0]
+    # remote user roles do not count for the local user
+    assert_equal(result["bob"], (False, None))
+    assert_equal(result["carol"], (False, None))
+
+
+def _catalog_mos():
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    return {
+        "AaaRole": [from_xml_str(
+            '<aaaRole dn="sys/user-ext/role-%s" name="%s"/>' % (name, name))
+            for name in ["admin", "read-only", "operations"]],
+        "AaaLocale": [from_xml_str(
+            '<aaaLocale dn="sys/user-ext/locale-emea" name="emea"/>')],
+        "AaaUser": [from_xml_str(
+            '<aaaUser dn="sys/user-ext/user-admin" name="admin"/>')],
+    }
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'query_classids')
+def test_user_create_bulk(mock_query_classids, mock_query_dn, mock_commit):
+    handle.commit_buffer_discard()
+    mock_query_classids.return_value = _catalog_mos()
+
+    users = [{"name": "user%d" % index, "pwd": "p@ssw0rd",
+              "pwd_life_time": None, "roles": "operations,read-only",
+              "locales": ["emea"]} for index in range(3)]
+    users.append({"name": "eve", "pwd_life_time": None,
+                  "roles": ["storage"], "locales": "apac"})
+    users.append({"name": "admin", "pwd_life_time": None,
+                  "account_status": "inactive"})
+
+    result = user_create_bulk(handle, users, dry_run=True)
+
+    assert_equal(mock_query_classids.call_count, 1)
+    assert not mock_query_dn.called
+    assert not mock_commit.called
+    assert_equal(result["created"], ["user0", "user1", "user2"])
+    assert_equal(sorted(result["failed"]), ["admin", "eve"])
+    assert "role 'storage'" in result["failed"]["eve"]
+    assert "locale 'apac'" in result["failed"]["eve"]
+    assert "already exists" in result["failed"]["admin"]
+
+    payload = result["dry_run"][0]
+    # 3 users, each with 2 roles and 1 locale, in one request
+    assert_equal(len(result["dry_run"]), 1)
+    assert_equal(payload["mo_count"], 12)
+    assert 'dn="sys/user-ext/user-user2/locale-emea"' in payload["xml"]
+    assert "user-eve" not in payload["xml"]
+    assert "user-admin" not in payload["xml"]
@@ -12,14 +12,12 @@ handle = UcsHandle("10.10.10.10", "username", "password")
 boot_policy_dn = "org-root/boot-policy-test"
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_lun_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_lun_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # case1:
     # Add two local_lun without type
@@ -34,18 +32,16 @@ def test_boot_local_lun_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_lun_add failed, error: Instance of Local Lun already added at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_lun_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_lun_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # case2:
     # Add first local_lun without type
@@ -63,18 +59,16 @@ def test_boot_local_lun_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_lun_add failed, error: Instance of Local Lun already added at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_lun_003(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_lun_003(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # case3:
     # Add first local_lun with type
@@ -92,18 +86,16 @@ def test_boot_local_lun_003(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_lun_add failed, error: Required parameter 'lun_name' or 'type' missing."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_lun_004(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_lun_004(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # case4:
     # Add first local_lun with type
@@ -123,18 +115,16 @@ def test_boot_local_lun_004(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_lun_add failed, error: Instance of Local Lun of type 'primary' already added at  order '1'."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_lun_005(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_lun_005(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # case5:
     # Add first local_lun with type
@@ -160,18 +150,16 @@ def test_boot_local_lun_005(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_lun_add failed, error: Both instance of Local Lun already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_jbod_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_jbod_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_jbod_case1
     # Add local_jbod
@@ -189,18 +177,16 @@ def test_boot_local_jbod_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_jbod_add failed, error: Instance of Local JBOD already added at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_local_jbod_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_local_jbod_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_jbod_case2
     # Add local_jbod without slot_number
@@ -212,18 +198,16 @@ def test_boot_local_jbod_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_jbod_add() takes exactly 3 arguments (2 given)"
     with assert_raises(TypeError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_embedded_disk_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_embedded_disk_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_embedded_disk_case1:
     # Add two local_embedded_disk  without type
@@ -238,18 +222,16 @@ def test_boot_embedded_disk_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_embedded_disk_add failed, error: Instance of Local Embedded Disk already added at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_embedded_disk_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_embedded_disk_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_embedded_disk_case2:
     # Add first local_embedded_disk without type
@@ -267,18 +249,16 @@ def test_boot_embedded_disk_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_embedded_disk_add failed, error: Instance of Local Embedded Disk already added at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_embedded_disk_003(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_embedded_disk_003(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_embedded_disk_case3:
     # Add first local_embedded_disk with type
@@ -296,18 +276,16 @@ def test_boot_embedded_disk_003(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_embedded_disk_add failed, error: Required parameter 'slot_number' or 'type' missing."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_embedded_disk_004(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_embedded_disk_004(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_embedded_disk_case4:
     # Add first local_embedded_disk with type
@@ -327,18 +305,16 @@ def test_boot_embedded_disk_004(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_embedded_disk_add failed, error: Instance of Local Embedded Disk  of type 'primary' already added at  order '1'."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_embedded_disk_005(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_embedded_disk_005(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # local_embedded_disk_case5:
     # Add first local_embedded_disk with type
@@ -364,18 +340,16 @@ def test_boot_embedded_disk_005(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_embedded_disk_add failed, error: Both instance of Local Embedded Disk already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_lan_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_lan_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # lan_case1:
     # Add first lan without vnic_name and with type
@@ -387,18 +361,16 @@ def test_boot_lan_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_lan_device_add() takes exactly 3 arguments (2 given)"
     with assert_raises(TypeError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_lan_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_lan_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # lan_case2:
     # Add first lan
@@ -421,18 +393,16 @@ def test_boot_lan_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_lan_device_add failed, error: Both instances of Lan Device are already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_iscsi_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_iscsi_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # iscsi_case1:
     # Add first iscsi without vnic_name and with type
@@ -445,18 +415,16 @@ def test_boot_iscsi_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_iscsi_device_add() got an unexpected keyword argument 'type'"
     with assert_raises(TypeError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_iscsi_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_iscsi_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # iscsi_case2:
     # Add first iscsi without vnic_name and type
@@ -468,18 +436,16 @@ def test_boot_iscsi_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_iscsi_device_add() takes exactly 3 arguments (2 given)"
     with assert_raises(TypeError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_iscsi_003(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_iscsi_003(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # iscsi_case3:
     # Add first iscsi
@@ -502,18 +468,16 @@ def test_boot_iscsi_003(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_iscsi_device_add failed, error: Both instances of ISCSI Device are already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_001(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_001(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # san_case1:
     # Add first san without type
@@ -530,18 +494,16 @@ def test_boot_san_001(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of San device is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_002(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_002(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # san_case4:
@@ -564,18 +526,16 @@ def test_boot_san_002(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of San device is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_003(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_003(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # san_case5:
     # Add first san without type
@@ -599,18 +559,16 @@ def test_boot_san_003(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of 'primary' san image is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_004(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_004(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # san_case9:
@@ -636,18 +594,16 @@ def test_boot_san_004(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of San device is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_005(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_005(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # san_case10:
     # Add first san without type
@@ -674,18 +630,16 @@ def test_boot_san_005(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of 'primary' san image is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_006(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_006(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # san_case11:
     # Add first san without type
@@ -715,18 +669,16 @@ def test_boot_san_006(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of SAN target type 'primary' is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_007(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_007(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # san_case15:
@@ -755,18 +707,16 @@ def test_boot_san_007(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Instance of San device is already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_008(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_008(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # san_case16:
@@ -797,18 +747,16 @@ def test_boot_san_008(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_san_device_add failed, error: Both instance of SAN Devices are already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_san_009(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_san_009(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # san_case17:
@@ -838,19 +786,17 @@ def test_boot_san_009(mock_login, mock_query_dn, mock_order_clear):
     ]
     expected_error_message = "_san_device_add failed, error: Both instance of SAN Devices are already added."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_special_case_01(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_special_case_01(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # special_case1:
     # Add first local_disk
@@ -866,18 +812,16 @@ def test_boot_special_case_01(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_device_add failed, error: local_disk cannot be added with other local devices."
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_special_case_02(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_special_case_02(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
 
     # special_case2:
@@ -894,19 +838,17 @@ def test_boot_special_case_02(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_device_add failed, error: 'cd_dvd' or 'cd_dvd_local, cd_dvd_remote'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_special_case_03(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_special_case_03(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # special_case3:
     # Add first floppy
@@ -922,18 +864,16 @@ def test_boot_special_case_03(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_device_add failed, error: 'floppy' or 'floppy_local, floppy_remote'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_special_case_04(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_special_case_04(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # special_case4:
     # Add sdcard
@@ -949,18 +889,16 @@ def test_boot_special_case_04(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_local_device_add failed, error: Device 'sdcard' already exist at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
 
-@patch('ucsm_apis.server.boot._boot_policy_order_clear')
 @patch.object(UcsHandle, 'query_dn')
 @patch.object(UcsHandle, 'login')
-def test_boot_special_case_05(mock_login, mock_query_dn, mock_order_clear):
+def test_boot_special_case_05(mock_login, mock_query_dn):
     mock_login.return_value = True
     bp = LsbootPolicy("org-root", name="test")
     mock_query_dn.return_value = bp
-    mock_order_clear.return_value = None
 
     # special_case4:
     # Add virtual_drive
@@ -976,6 +914,750 @@ def test_boot_special_case_05(mock_login, mock_query_dn, mock_order_clear):
 
     expected_error_message = "_vmedia_device_add failed, error: Device 'virtual_drive' already exist at order '1'"
     with assert_raises(UcsOperationError) as error:
-         boot_policy_order_set(handle, boot_policy_dn, devices)
+         boot_policy_order_set(handle, "test", devices)
     assert_equal(error.exception.message, expected_error_message)
 
+
+
+def _boot_policy_response(xml_str):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    response = Mock()
+    response.out_configs.child = [from_xml_str(xml_str)] if xml_str else []
+    return response
+
+
+_existing_bp_xml = (
+    '<lsbootPolicy dn="org-root/boot-policy-test" name="test" '
+    'rebootOnUpdate="yes">'
+    '<lsbootVirtualMedia dn="org-root/boot-policy-test/read-only-vm" '
+    'access="read-only" order="1"/>'
+    '<lsbootLan dn="org-root/boot-policy-test/lan" order="2" prot="pxe">'
+    '<lsbootLanImagePath dn="org-root/boot-policy-test/lan/path-primary" '
+    'type="primary" vnicName="vnic0"/>'
+    '<lsbootLanImagePath dn="org-root/boot-policy-test/lan/path-secondary" '
+    'type="secondary" vnicName="vnic1"/>'
+    '</lsbootLan>'
+    '</lsbootPolicy>')
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_no_change(mock_login, mock_query_dn, mock_commit):
+    mock_login.return_value = True
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "cd_dvd", "device_order": "1"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic1"}]
+    boot_policy_order_set(handle, "test", devices)
+
+    assert_equal(mock_query_dn.call_count, 1)
+    assert not mock_commit.called
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_diff(mock_login, mock_query_dn, mock_commit):
+    mock_login.return_value = True
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+    staged = {}
+    mock_commit.side_effect = lambda *args, **kwargs: staged.update(
+        dict((dn, mo.status) for dn, mo in handle._get_commit_buf().items()))
+
+    # lan moves to order 1 with a single vnic, cd_dvd is replaced by
+    # local_disk
+    devices = [{"device_name": "lan", "device_order": "1",
+                "vnic_name": "vnic0"},
+               {"device_name": "local_disk", "device_order": "2"}]
+    boot_policy_order_set(handle, "test", devices)
+    handle.commit_buffer_discard()
+
+    assert_equal(mock_commit.call_count, 1)
+    assert_equal(staged, {
+        "org-root/boot-policy-test/lan": "created,modified",
+        "org-root/boot-policy-test/lan/path-secondary": "deleted",
+        "org-root/boot-policy-test/storage": "created,modified",
+        "org-root/boot-policy-test/read-only-vm": "deleted",
+    })
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_exists(mock_login, mock_query_dn):
+    mock_login.return_value = True
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "cd_dvd", "device_order": "1"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic1"}]
+    exists, mo = boot_policy_order_exists(handle, "test", devices)
+
+    assert exists
+    assert_equal(mo.dn, "org-root/boot-policy-test")
+    assert_equal(mock_query_dn.call_count, 1)
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_diff(mock_login, mock_query_dn):
+    mock_login.return_value = True
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "lan", "device_order": "1",
+                "vnic_name": "vnic0"},
+               {"device_name": "sdcard", "device_order": "2"}]
+    diff = boot_policy_order_diff(handle, "test", devices)
+
+    assert_equal(diff["missing"],
+                 [{"device_name": "sdcard", "device_order": "2"}])
+    assert_equal(diff["extra"],
+                 [{"device_name": "cd_dvd", "device_order": "1"}])
+    assert_equal([(d["device_name"], d["existing_order"],
+                   d["expected_order"]) for d in diff["mismatched"]],
+                 [("lan", "2", "1")])
+    assert_equal(boot_policy_order_exists(handle, "test", devices),
+                 (False, None))
+
+
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_compliance_scan(mock_login, mock_query_classid):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    mock_login.return_value = True
+    # same boot order as _existing_bp_xml, children in a different order
+    reordered_bp_xml = (
+        '<lsbootPolicy dn="org-root/org-hr/boot-policy-hr" name="hr">'
+        '<lsbootLan dn="org-root/org-hr/boot-policy-hr/lan" order="2">'
+        '<lsbootLanImagePath '
+        'dn="org-root/org-hr/boot-policy-hr/lan/path-secondary" '
+        'type="secondary" vnicName="vnic1"/>'
+        '<lsbootLanImagePath '
+        'dn="org-root/org-hr/boot-policy-hr/lan/path-primary" '
+        'type="primary" vnicName="vnic0"/>'
+        '</lsbootLan>'
+        '<lsbootVirtualMedia dn="org-root/org-hr/boot-policy-hr/read-only-vm" '
+        'access="read-only" order="1"/>'
+        '</lsbootPolicy>')
+    other_bp_xml = (
+        '<lsbootPolicy dn="org-root/boot-policy-other" name="other">'
+        '<lsbootVirtualMedia dn="org-root/boot-policy-other/read-only-vm" '
+        'access="read-only" order="2"/>'
+        '</lsbootPolicy>')
+    response = Mock()
+    response.out_configs.child = [from_xml_str(xml_str) for xml_str in
+                                  [_existing_bp_xml, reordered_bp_xml,
+                                   other_bp_xml]]
+    mock_query_classid.return_value = response
+
+    golden_specs = {
+        "pxe": [{"device_name": "cd_dvd", "device_order": "1"},
+                {"device_name": "lan", "device_order": "2",
+                 "vnic_name": "vnic0"},
+                {"device_name": "lan", "device_order": "2",
+                 "vnic_name": "vnic1"}],
+        "cd": [{"device_name": "cd_dvd", "device_order": "1"}]
+    }
+    report = boot_policy_compliance_scan(handle, golden_specs)
+
+    assert_equal(mock_query_classid.call_count, 1)
+    assert_equal(report["golden"]["pxe"]["compliant"],
+                 ["org-root/boot-policy-test",
+                  "org-root/org-hr/boot-policy-hr"])
+    assert_equal(report["golden"]["cd"]["compliant"], [])
+    assert_equal(report["unmatched"], ["org-root/boot-policy-other"])
+    assert_equal(len(report["groups"]), 2)
+
+    report = boot_policy_compliance_scan(handle, golden_specs,
+                                         org_dn="org-root/org-hr")
+    assert_equal(report["golden"]["pxe"]["compliant"],
+                 ["org-root/org-hr/boot-policy-hr"])
+    assert_equal(report["unmatched"], [])
+
+
+# a boot policy as UCSM returns it, with the read-only values it fills in
+_ucsm_bp_xml = (
+    '<lsbootPolicy bootMode="legacy" childAction="deleteNonPresent" '
+    'descr="" dn="org-root/boot-policy-live" enforceVnicName="yes" '
+    'intId="78531" name="live" policyLevel="0" policyOwner="local" '
+    'purpose="operational" rebootOnUpdate="no" type="storage">'
+    '<lsbootVirtualMedia access="read-only" childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/read-only-vm" lunId="0" '
+    'mappingName="" order="1" type="virtual-media"/>'
+    '<lsbootLan access="read-only" childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/lan" order="2" prot="pxe" type="lan">'
+    '<lsbootLanImagePath bootIpPolicyName="" '
+    'childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/lan/path-primary" iSCSIVnicName="" '
+    'imgPolicyName="" imgSecPolicyName="" provSrvPolicyName="" '
+    'type="primary" vnicName="vnic0"/>'
+    '</lsbootLan>'
+    '<lsbootSan access="read-write" childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/san" order="3" type="storage">'
+    '<lsbootSanCatSanImage childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/san/sanimg-primary" type="primary" '
+    'vnicName="fc0">'
+    '<lsbootSanCatSanImagePath '
+    'dn="org-root/boot-policy-live/san/sanimg-primary/sanimgpath-primary" '
+    'lun="0" type="primary" vnicName="fc0" '
+    'wwn="20:00:00:25:B5:00:00:01"/>'
+    '</lsbootSanCatSanImage>'
+    '</lsbootSan>'
+    '<lsbootStorage access="read-write" childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/storage" order="4" type="storage">'
+    '<lsbootLocalStorage childAction="deleteNonPresent" '
+    'dn="org-root/boot-policy-live/storage/local-storage">'
+    '<lsbootDefaultLocalImage '
+    'dn="org-root/boot-policy-live/storage/local-storage/local-any" '
+    'order="4" type="local-any"/>'
+    '</lsbootLocalStorage>'
+    '</lsbootStorage>'
+    '</lsbootPolicy>')
+
+_ucsm_bp_devices = [
+    {"device_name": "cd_dvd", "device_order": "1"},
+    {"device_name": "lan", "device_order": "2", "vnic_name": "vnic0"},
+    {"device_name": "san", "device_order": "3", "vnic_name": "fc0",
+     "type": "primary", "target_type": "primary",
+     "wwn": "20:00:00:25:B5:00:00:01", "lun": "0"},
+    {"device_name": "local_disk", "device_order": "4"},
+]
+
+
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_compliance_scan_ucsm_response(mock_login,
+                                                   mock_query_classid):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+    from ucsm_apis.server.boot import _boot_policy_expected_get
+
+    mock_login.return_value = True
+    response = Mock()
+    response.out_configs.child = [from_xml_str(_ucsm_bp_xml)]
+    mock_query_classid.return_value = response
+
+    # read-only values returned by UCSM do not change the fingerprint
+    live_bp = from_xml_str(_ucsm_bp_xml)
+    golden_bp = compile_boot_plan(_ucsm_bp_devices)
+    assert_equal(boot_policy_fingerprint(live_bp),
+                 boot_policy_fingerprint(
+                     _boot_policy_expected_get("golden", "org-root",
+                                               golden_bp)))
+
+    report = boot_policy_compliance_scan(
+        handle, {"golden": _ucsm_bp_devices,
+                 "cd": [{"device_name": "cd_dvd", "device_order": "1"}]})
+    assert_equal(report["golden"]["golden"]["compliant"],
+                 ["org-root/boot-policy-live"])
+    # reported once, not as deviating from the other spec
+    assert_equal(report["golden"]["cd"], {
+        "fingerprint": report["golden"]["cd"]["fingerprint"],
+        "compliant": []})
+    assert_equal(report["unmatched"], [])
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_bulk(mock_login, mock_query_classid, mock_commit):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    mock_login.return_value = True
+    cd_bp_xml = (
+        '<lsbootPolicy dn="org-root/org-hr/boot-policy-cd" name="cd">'
+        '<lsbootVirtualMedia dn="org-root/org-hr/boot-policy-cd/read-only-vm" '
+        'access="read-only" order="1"/>'
+        '</lsbootPolicy>')
+    response = Mock()
+    response.out_configs.child = [from_xml_str(_existing_bp_xml),
+                                  from_xml_str(cd_bp_xml)]
+    mock_query_classid.return_value = response
+    commits = []
+    mock_commit.side_effect = lambda *args, **kwargs: commits.append(
+        sorted(handle._get_commit_buf().keys()))
+
+    devices = [{"device_name": "cd_dvd", "device_order": "1"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic1"}]
+    result = boot_policy_order_set_bulk(
+        handle,
+        ["org-root/boot-policy-test",
+         {"name": "cd", "org_dn": "org-root/org-hr"},
+         {"name": "missing"}],
+        devices)
+    handle.commit_buffer_discard()
+
+    assert_equal(mock_query_classid.call_count, 1)
+    assert_equal(result["skipped"], ["org-root/boot-policy-test"])
+    assert_equal(result["changed"], ["org-root/org-hr/boot-policy-cd"])
+    assert_equal(list(result["failed"]), ["org-root/boot-policy-missing"])
+    assert_equal(commits, [["org-root/org-hr/boot-policy-cd/lan"]])
+
+
+def test_compile_boot_plan():
+    devices = [{"device_name": "cd_dvd", "device_order": 1},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"}]
+    plan = compile_boot_plan(devices)
+
+    assert compile_boot_plan(devices) is plan
+    assert compile_boot_plan(plan) is plan
+    assert_equal(hash(plan), hash(compile_boot_plan(
+        [dict(device) for device in devices])))
+    assert_equal(list(plan)[0], {"device_name": "cd_dvd",
+                                 "device_order": "1"})
+    assert_raises(AttributeError, setattr, plan, "_entries", ())
+    assert_raises(UcsOperationError, compile_boot_plan,
+                  [{"device_name": "local_disk", "device_order": "1"},
+                   {"device_name": "sdcard", "device_order": "2"}])
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_exists_plan(mock_login, mock_query_dn):
+    mock_login.return_value = True
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+
+    plan = compile_boot_plan(
+        [{"device_name": "cd_dvd", "device_order": "1"},
+         {"device_name": "lan", "device_order": "2", "vnic_name": "vnic0"},
+         {"device_name": "lan", "device_order": "2", "vnic_name": "vnic1"}])
+    exists, mo = boot_policy_order_exists(handle, "test", plan)
+
+    assert exists
+
+
+@patch.object(UcsHandle, 'query_classids')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_consumers(mock_login, mock_query_classids):
+    mock_login.return_value = True
+    mock_query_classids.return_value = {
+        "LsbootPolicy": [Mock(dn="org-root/boot-policy-pxe"),
+                         Mock(dn="org-root/org-hr/boot-policy-pxe"),
+                         Mock(dn="org-root/boot-policy-default"),
+                         Mock(dn="org-root/org-hr/boot-policy-default")],
+        "LsServer": [
+            Mock(dn="org-root/org-hr/ls-sp1", type="instance",
+                 oper_boot_policy_name="org-root/org-hr/boot-policy-pxe",
+                 boot_policy_name="pxe"),
+            # not resolved by UCSM yet, inherited from org-root
+            Mock(dn="org-root/org-hr/org-dev/ls-sp2", type="instance",
+                 oper_boot_policy_name="", boot_policy_name="pxe"),
+            Mock(dn="org-root/ls-sp3", type="instance",
+                 oper_boot_policy_name="", boot_policy_name="gone"),
+            # no policy name at all, the closest default policy applies
+            Mock(dn="org-root/org-hr/org-dev/ls-sp4", type="instance",
+                 oper_boot_policy_name="", boot_policy_name=""),
+            Mock(dn="org-root/ls-tmpl", type="updating-template",
+                 oper_boot_policy_name="org-root/boot-policy-pxe",
+                 boot_policy_name="pxe"),
+        ]}
+
+    consumers = boot_policy_consumers(handle)
+
+    assert_equal(consumers, {
+        "org-root/org-hr/boot-policy-pxe": ["org-root/org-hr/ls-sp1",
+                                            "org-root/org-hr/org-dev/ls-sp2"],
+        "org-root/boot-policy-default": ["org-root/ls-sp3"],
+        "org-root/org-hr/boot-policy-default": [
+            "org-root/org-hr/org-dev/ls-sp4"]})
+
+    cache = BootPolicyConsumers(handle)
+    boot_policy_consumers(handle, cache=cache)
+    boot_policy_consumers(handle, cache=cache)
+    assert_equal(mock_query_classids.call_count, 2)
+
+
+def _boot_policy_classid_side_effect(xml_strs):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    def _query_classid(class_id, filter_str=None, hierarchy=False,
+                       need_response=False):
+        mos = [from_xml_str(xml_str) for xml_str in xml_strs]
+        if not need_response:
+            return mos
+        response = Mock()
+        response.out_configs.child = [mo for mo in mos
+                                      if filter_str is None or
+                                      '"%s"' % mo.dn in filter_str]
+        return response
+    return _query_classid
+
+
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_export(mock_login, mock_query_classid):
+    import json
+
+    mock_login.return_value = True
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml])
+
+    lines = list(boot_policy_export(handle, batch_size=1))
+
+    assert_equal(len(lines), 1)
+    doc = json.loads(lines[0])
+    assert_equal(doc["name"], "test")
+    assert_equal(doc["org_dn"], "org-root")
+    assert_equal(doc["reboot_on_update"], "yes")
+    assert_equal(doc["devices"],
+                 [{"device_name": "cd_dvd", "device_order": "1"},
+                  {"device_name": "lan", "device_order": "2",
+                   "vnic_name": "vnic0"},
+                  {"device_name": "lan", "device_order": "2",
+                   "vnic_name": "vnic1"}])
+
+
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_export_skips_cache(mock_login, mock_query_classid):
+    mock_login.return_value = True
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml])
+
+    cache = boot_policy_cache_enable(handle)
+    try:
+        assert_equal(len(list(boot_policy_export(handle, batch_size=1))), 1)
+        assert_equal(cache.tree_get("org-root/boot-policy-test"), None)
+    finally:
+        boot_policy_cache_disable(handle)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_import(mock_login, mock_query_classid, mock_commit):
+    import json
+
+    mock_login.return_value = True
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml])
+    commits = []
+    mock_commit.side_effect = lambda *args, **kwargs: commits.append(
+        sorted(handle._get_commit_buf().keys()))
+
+    doc = json.loads(list(boot_policy_export(handle))[0])
+    new_doc = dict(doc, name="clone")
+    stream = [json.dumps(doc), "", json.dumps(new_doc), "{not json"]
+    result = boot_policy_import(handle, stream, batch_size=1)
+    handle.commit_buffer_discard()
+
+    assert_equal(result["skipped"], ["org-root/boot-policy-test"])
+    assert_equal(result["changed"], ["org-root/boot-policy-clone"])
+    assert_equal(list(result["failed"]), [4])
+    assert_equal(commits, [["org-root/boot-policy-clone"]])
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_import_failed_doc_stages_nothing(mock_login,
+                                                      mock_query_classid,
+                                                      mock_commit):
+    import json
+
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml])
+
+    doc = json.loads(list(boot_policy_export(handle))[0])
+    # device changes plus an invalid policy property
+    bad_doc = dict(doc, boot_mode="bogus",
+                   devices=[{"device_name": "lan", "device_order": "1",
+                             "vnic_name": "vnic-new"}])
+    result = boot_policy_import(handle, [json.dumps(bad_doc)])
+
+    assert_equal(list(result["failed"]), ["org-root/boot-policy-test"])
+    assert_equal(result["changed"], [])
+    assert_equal(handle._get_commit_buf(), {})
+    assert not mock_commit.called
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_dry_run(mock_login, mock_query_dn, mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_dn.return_value = _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "lan", "device_order": "1",
+                "vnic_name": "vnic0"}]
+    payload = boot_policy_order_set(handle, "test", devices, dry_run=True)
+
+    assert not mock_commit.called
+    assert_equal(handle._get_commit_buf(), {})
+    assert '<configConfMos' in payload["xml"]
+    assert 'dn="org-root/boot-policy-test/read-only-vm"' in payload["xml"]
+    assert payload["mo_count"] > 0
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_security_enable(mock_login, mock_query_dn, mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_dn.return_value = Mock(dn="org-root/boot-policy-test",
+                                      boot_mode="uefi")
+    staged = []
+    mock_commit.side_effect = lambda *args, **kwargs: staged.extend(
+        handle._get_commit_buf().keys())
+
+    mo = boot_security_enable(handle, "test")
+    handle.commit_buffer_discard()
+
+    assert_equal(staged, ["org-root/boot-policy-test/boot-security"])
+    assert_equal(mo.secure_boot, "yes")
+
+    mock_query_dn.return_value = Mock(dn="org-root/boot-policy-test",
+                                      boot_mode="legacy")
+    assert_raises(UcsOperationError, boot_security_enable, handle, "test")
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'query_classids')
+@patch.object(UcsHandle, 'login')
+def test_boot_security_set_bulk(mock_login, mock_query_classids,
+                                mock_query_classid, mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_classids.return_value = {
+        "LsbootPolicy": [Mock(dn="org-root/boot-policy-a", boot_mode="uefi"),
+                         Mock(dn="org-root/boot-policy-b", boot_mode="uefi"),
+                         Mock(dn="org-root/boot-policy-c",
+                              boot_mode="legacy")],
+        "LsbootBootSecurity": [
+            Mock(dn="org-root/boot-policy-b/boot-security",
+                 secure_boot="yes")]}
+    mock_query_classid.return_value = [
+        Mock(dn="org-root/boot-policy-a/boot-security", secure_boot="yes"),
+        Mock(dn="org-root/boot-policy-b/boot-security", secure_boot="yes")]
+    commits = []
+    mock_commit.side_effect = lambda *args, **kwargs: commits.append(
+        sorted(handle._get_commit_buf().keys()))
+
+    result = boot_security_set_bulk(
+        handle, [{"name": "a"}, "org-root/boot-policy-b",
+                 "org-root/boot-policy-c", "org-root/boot-policy-d"])
+    handle.commit_buffer_discard()
+
+    assert_equal(result["changed"], ["org-root/boot-policy-a"])
+    assert_equal(result["skipped"], ["org-root/boot-policy-b"])
+    assert_equal(sorted(result["failed"]), ["org-root/boot-policy-c",
+                                            "org-root/boot-policy-d"])
+    assert_equal(commits, [["org-root/boot-policy-a/boot-security"]])
+    assert_equal(result["secure_boot"]["org-root/boot-policy-a"], "yes")
+    assert_equal(result["secure_boot"]["org-root/boot-policy-d"], None)
+    assert_equal(mock_query_classid.call_count, 1)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_cache(mock_login, mock_query_dn, mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_dn.side_effect = lambda *args, **kwargs: \
+        _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "cd_dvd", "device_order": "1"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic1"}]
+    cache = boot_policy_cache_enable(handle)
+    try:
+        assert boot_policy_exists(handle, "test")[0]
+        assert boot_policy_order_exists(handle, "test", devices)[0]
+        boot_policy_order_set(handle, "test", devices)
+        assert_equal(mock_query_dn.call_count, 1)
+        assert not mock_commit.called
+
+        # a set which changes the policy drops the cached tree
+        boot_policy_order_set(handle, "test", devices[:1])
+        assert mock_commit.called
+        boot_policy_order_exists(handle, "test", devices)
+        assert_equal(mock_query_dn.call_count, 2)
+
+        # so does a change event below the boot policy
+        cache._event_cb(Mock(mo=Mock(
+            dn="org-root/boot-policy-test/lan/path-primary")))
+        boot_policy_order_exists(handle, "test", devices)
+        assert_equal(mock_query_dn.call_count, 3)
+    finally:
+        boot_policy_cache_disable(handle)
+        handle.commit_buffer_discard()
+
+    boot_policy_order_exists(handle, "test", devices)
+    assert_equal(mock_query_dn.call_count, 4)
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_cache_returns_copies(mock_login, mock_query_dn):
+    mock_login.return_value = True
+    mock_query_dn.side_effect = lambda *args, **kwargs: \
+        _boot_policy_response(_existing_bp_xml)
+
+    devices = [{"device_name": "cd_dvd", "device_order": "1"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic0"},
+               {"device_name": "lan", "device_order": "2",
+                "vnic_name": "vnic1"}]
+    boot_policy_cache_enable(handle)
+    try:
+        status, mo = boot_policy_exists(handle, "test")
+        assert status
+        # a caller changing the returned tree does not change the cache
+        del mo.child[:]
+        status, mo = boot_policy_order_exists(handle, "test", devices)
+        assert status
+        assert_equal(len(mo.child), 2)
+        assert_equal(mock_query_dn.call_count, 1)
+    finally:
+        boot_policy_cache_disable(handle)
+
+
+def test_compile_boot_plan_raw_values():
+    def san(lun):
+        return [{"device_name": "san", "device_order": "1",
+                 "vnic_name": "fc0", "type": "primary",
+                 "target_type": "primary",
+                 "wwn": "20:00:00:25:B5:00:00:01", "lun": lun}]
+
+    plan = compile_boot_plan(san("0"))
+    assert_equal(list(plan)[0]["lun"], "0")
+    # lun=0 is rejected as it was before plans were compiled, even after
+    # the string form is cached
+    assert_raises(UcsOperationError, compile_boot_plan, san(0))
+    # valid non-string values are normalized to strings
+    assert_equal(list(compile_boot_plan(san(1)))[0]["lun"], "1")
+
+
+# a boot policy with a local device the boot APIs do not manage
+_nvme_bp_xml = (
+    '<lsbootPolicy dn="org-root/boot-policy-nvme" name="nvme">'
+    '<lsbootVirtualMedia dn="org-root/boot-policy-nvme/read-only-vm" '
+    'access="read-only" order="1"/>'
+    '<lsbootStorage dn="org-root/boot-policy-nvme/storage" order="2">'
+    '<lsbootLocalStorage '
+    'dn="org-root/boot-policy-nvme/storage/local-storage">'
+    '<lsbootNvme dn="org-root/boot-policy-nvme/storage/local-storage/nvme" '
+    'order="2"/>'
+    '</lsbootLocalStorage>'
+    '</lsbootStorage>'
+    '</lsbootPolicy>')
+
+
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_compliance_scan_unknown_device(mock_login,
+                                                    mock_query_classid):
+    mock_login.return_value = True
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml, _nvme_bp_xml])
+
+    report = boot_policy_compliance_scan(
+        handle, {"cd": [{"device_name": "cd_dvd", "device_order": "1"}]})
+
+    assert_equal(list(report["failed"]), ["org-root/boot-policy-nvme"])
+    assert_equal(report["unmatched"], ["org-root/boot-policy-test"])
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_unknown_device(mock_login, mock_query_dn,
+                                       mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_dn.side_effect = lambda *args, **kwargs: \
+        _boot_policy_response(_nvme_bp_xml)
+    staged = []
+    mock_commit.side_effect = lambda *args, **kwargs: staged.append(
+        dict((dn, mo.status) for dn, mo in handle._get_commit_buf().items()))
+
+    # the unknown nvme device is replaced by local_disk
+    boot_policy_order_set(handle, "nvme",
+                          [{"device_name": "cd_dvd", "device_order": "1"},
+                           {"device_name": "local_disk",
+                            "device_order": "2"}])
+    handle.commit_buffer_discard()
+    # without local devices the whole storage container goes
+    boot_policy_order_set(handle, "nvme",
+                          [{"device_name": "cd_dvd", "device_order": "1"}])
+    handle.commit_buffer_discard()
+
+    assert_equal(staged, [
+        {"org-root/boot-policy-nvme/storage/local-storage/local-any":
+         "created,modified",
+         "org-root/boot-policy-nvme/storage/local-storage/nvme": "deleted"},
+        {"org-root/boot-policy-nvme/storage": "deleted"},
+    ])
+
+
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_boot_policy_order_exists_never_raises(mock_login, mock_query_dn):
+    from ucsmsdk.ucsexception import UcsException
+
+    mock_login.return_value = True
+    devices = [{"device_name": "cd_dvd", "device_order": "1"}]
+
+    mock_query_dn.side_effect = UcsException(552, "Authorization required")
+    assert_equal(boot_policy_order_exists(handle, "test", devices),
+                 (False, None))
+
+    mock_query_dn.side_effect = lambda *args, **kwargs: \
+        _boot_policy_response(_nvme_bp_xml)
+    assert_equal(boot_policy_order_exists(handle, "nvme", devices),
+                 (False, None))
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_boot_order_set_bulk_policy_error(mock_login, mock_query_classid,
+                                          mock_commit):
+    import ucsm_apis.server.boot as boot
+
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_classid.side_effect = _boot_policy_classid_side_effect(
+        [_existing_bp_xml, _nvme_bp_xml])
+    commits = []
+    mock_commit.side_effect = lambda *args, **kwargs: commits.append(
+        sorted(handle._get_commit_buf().keys()))
+
+    diff_stage = boot._boot_policy_diff_stage
+
+    def _diff_stage(handle, existing_boot_policy, *args):
+        # fails half way through staging the first policy
+        staged = diff_stage(handle, existing_boot_policy, *args)
+        if existing_boot_policy.dn == "org-root/boot-policy-test":
+            raise KeyError("boom")
+        return staged
+
+    with patch.object(boot, "_boot_policy_diff_stage", _diff_stage):
+        result = boot_policy_order_set_bulk(
+            handle, ["org-root/boot-policy-test",
+                     "org-root/boot-policy-nvme"],
+            [{"device_name": "cd_dvd", "device_order": "1"}])
+    handle.commit_buffer_discard()
+
+    assert_equal(list(result["failed"]), ["org-root/boot-policy-test"])
+    # the unknown nvme device is removed with its storage container
+    assert_equal(result["changed"], ["org-root/boot-policy-nvme"])
+    assert_equal(commits, [["org-root/boot-policy-nvme/storage"]])
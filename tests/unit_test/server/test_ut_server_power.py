@@ -6,6 +6,16 @@ from ucsmsdk.ucshandle import UcsHandle
 from ucsmsdk.ucsexception import UcsOperationError
 
 from ucsm_apis.server.power import server_power_on
+from ucsm_apis.server.power import server_power_set_bulk
+from ucsm_apis.server.power import server_power_state_all
+from ucsm_apis.server.power import server_power_on_staggered
+from ucsm_apis.server.power import _server_power_waves
+from ucsm_apis.server.power import service_profile_power_set
+from ucsm_apis.server.power import server_power_ensure
+from ucsm_apis.server.power import server_power_set_fleet
+from ucsm_apis.server.power import _power_event_handles
+from ucsm_apis.utils.fleet import UcsHandlePool
+from ucsm_apis.utils.resolver import ServerResolver
 
 handle = UcsHandle("1.1.1.1", "admin", "dummy")
 
@@ -96,3 +106,349 @@ def test_power_on_chassis1_blade1_pass(mock_login, mock_query_dn, mock_commit):
     mock_commit.return_value = None
 
     assert server_power_on(handle, chassis_id=1, blade_id=1) is None
+
+
+def _server_mo(dn, assigned_to_dn=None, association="associated",
+               oper_power="off"):
+    return Mock(dn=dn, assigned_to_dn=assigned_to_dn,
+                association=association, oper_power=oper_power)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_set_bulk_partial_failure(mock_login, mock_query_dns,
+                                        mock_commit):
+    mock_login.return_value = True
+    mock_query_dns.return_value = {
+        "sys/chassis-1/blade-1": _server_mo("sys/chassis-1/blade-1",
+                                            "org-root/ls-sp1"),
+        "sys/chassis-1/blade-2": _server_mo("sys/chassis-1/blade-2"),
+        "sys/rack-unit-1": None,
+    }
+    mock_commit.return_value = None
+
+    servers = [{"chassis_id": 1, "blade_id": 1},
+               {"chassis_id": 1, "blade_id": 2},
+               {"rack_id": 1}]
+    result = server_power_set_bulk(handle, servers, "up")
+
+    assert_equal(result["success"], ["sys/chassis-1/blade-1"])
+    assert_equal(sorted(result["failed"]),
+                 ["sys/chassis-1/blade-2", "sys/rack-unit-1"])
+    assert_equal(mock_query_dns.call_count, 1)
+    assert_equal(mock_commit.call_count, 1)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_set_bulk_batches(mock_login, mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    mock_query_dns.side_effect = lambda dns: dict(
+        (dn, _server_mo(dn, "org-root/ls-sp" + dn[-1])) for dn in dns)
+    mock_commit.return_value = None
+
+    servers = ["sys/chassis-1/blade-%d" % i for i in range(1, 6)]
+    result = server_power_set_bulk(handle, servers, "up", batch_size=2)
+
+    assert_equal(result["success"], servers)
+    assert_equal(result["failed"], {})
+    assert_equal(mock_query_dns.call_count, 3)
+    assert_equal(mock_commit.call_count, 3)
+
+
+@patch.object(UcsHandle, 'query_classids')
+@patch.object(UcsHandle, 'login')
+def test_power_state_all(mock_login, mock_query_classids):
+    from ucsmsdk.ucsxmlcodec import from_xml_str
+
+    mock_login.return_value = True
+    blade = from_xml_str('<computeBlade dn="sys/chassis-1/blade-2" '
+                         'chassisId="1" slotId="2" operPower="on" '
+                         'association="associated" '
+                         'assignedToDn="org-root/ls-sp1"/>')
+    rack = from_xml_str('<computeRackUnit dn="sys/rack-unit-3" id="3" '
+                        'operPower="off" association="none" '
+                        'assignedToDn=""/>')
+    mock_query_classids.return_value = {"ComputeBlade": [blade],
+                                        "ComputeRackUnit": [rack]}
+
+    servers = server_power_state_all(handle)
+
+    assert_equal(mock_query_classids.call_count, 1)
+    assert_equal([s["dn"] for s in servers],
+                 ["sys/chassis-1/blade-2", "sys/rack-unit-3"])
+    assert_equal(servers[0]["chassis_id"], "1")
+    assert_equal(servers[0]["blade_id"], "2")
+    assert_equal(servers[0]["oper_power"], "on")
+    assert_equal(servers[1]["rack_id"], "3")
+    assert_equal(servers[1]["oper_power"], "off")
+
+
+class _FakeEventHandle(object):
+    """delivers the given events as soon as a watch block is added"""
+    events = []
+    instances = []
+
+    def __init__(self, handle):
+        self.class_ids = []
+        self.instances.append(self)
+
+    def add(self, class_id=None, call_back=None, timeout_sec=None):
+        # the handle is shared, a per-wait timeout would leak to other waits
+        assert timeout_sec is None
+        self.class_ids.append(class_id)
+        for mce in self.events:
+            if mce.mo.dn.startswith(
+                    {"ComputeBlade": "sys/chassis-",
+                     "ComputeRackUnit": "sys/rack-unit-"}[class_id]):
+                call_back(mce)
+        return "watch_block"
+
+    def remove(self, watch_block):
+        pass
+
+
+@patch('ucsm_apis.server.power.UcsEventHandle', _FakeEventHandle)
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_set_bulk_wait_event(mock_login, mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    dns = ["sys/chassis-1/blade-1", "sys/chassis-1/blade-2"]
+    mock_query_dns.side_effect = lambda dns: dict(
+        (dn, _server_mo(dn, "org-root/ls-sp" + dn[-1])) for dn in dns)
+    mock_commit.return_value = None
+    _power_event_handles.clear()
+    _FakeEventHandle.instances = []
+    _FakeEventHandle.events = [
+        Mock(mo=Mock(dn=dn, oper_power="on")) for dn in dns] + [
+        Mock(mo=Mock(dn="sys/chassis-1/blade-3", oper_power="on"))]
+
+    result = server_power_set_bulk(handle, dns, "up", wait=True, timeout=5)
+
+    assert_equal(result["success"], dns)
+    assert_equal(result["failed"], {})
+
+    # a second wait reuses the event handle, only blades are watched
+    server_power_set_bulk(handle, dns, "up", wait=True, timeout=5)
+    assert_equal(len(_FakeEventHandle.instances), 1)
+    assert_equal(_FakeEventHandle.instances[0].class_ids,
+                 ["ComputeBlade", "ComputeBlade"])
+    _power_event_handles.clear()
+
+
+@patch('ucsm_apis.server.power._power_wait_poll_sec', 0.01)
+@patch('ucsm_apis.server.power.UcsEventHandle')
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_set_bulk_wait_poll_timeout(mock_login, mock_query_dns,
+                                          mock_commit, mock_event_handle):
+    mock_login.return_value = True
+    _power_event_handles.clear()
+    mock_event_handle.return_value.add.return_value = None
+    mock_query_dns.side_effect = lambda dns: dict(
+        (dn, _server_mo(dn, "org-root/ls-sp" + dn[-1],
+                        oper_power="on" if dn.endswith("1") else "off"))
+        for dn in dns)
+    mock_commit.return_value = None
+
+    dns = ["sys/chassis-1/blade-1", "sys/chassis-1/blade-2"]
+    result = server_power_set_bulk(handle, dns, "up", wait=True,
+                                   timeout=0.05)
+
+    assert_equal(result["success"], ["sys/chassis-1/blade-1"])
+    assert_equal(list(result["failed"]), ["sys/chassis-1/blade-2"])
+    _power_event_handles.clear()
+
+
+def test_power_waves_limits():
+    dns = ["sys/chassis-1/blade-1", "sys/chassis-1/blade-2",
+           "sys/chassis-1/blade-3", "sys/chassis-2/blade-1",
+           "sys/rack-unit-1"]
+
+    waves = _server_power_waves(dns, max_per_chassis=1, max_per_domain=2)
+
+    assert_equal(waves, [["sys/chassis-1/blade-1", "sys/chassis-2/blade-1"],
+                         ["sys/chassis-1/blade-2", "sys/rack-unit-1"],
+                         ["sys/chassis-1/blade-3"]])
+
+
+@patch('ucsm_apis.server.power.time.sleep')
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_on_staggered(mock_login, mock_query_dns, mock_commit,
+                            mock_sleep):
+    mock_login.return_value = True
+    mock_query_dns.side_effect = lambda dns: dict(
+        (dn, _server_mo(dn, "org-root/ls-" + dn)) for dn in dns)
+    mock_commit.return_value = None
+    progress = []
+
+    servers = [{"chassis_id": 1, "blade_id": i} for i in range(1, 5)]
+    result = server_power_on_staggered(
+        handle, servers, max_per_chassis=2, wave_delay=10,
+        progress_cb=lambda index, count, wave: progress.append(
+            (index, count, len(wave["success"]))))
+
+    assert_equal(len(result["success"]), 4)
+    assert_equal(progress, [(0, 2, 2), (1, 2, 2)])
+    assert_equal(mock_commit.call_count, 2)
+    mock_sleep.assert_called_once_with(10)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_classid')
+@patch.object(UcsHandle, 'login')
+def test_service_profile_power_set(mock_login, mock_query_classid,
+                                   mock_commit):
+    mock_login.return_value = True
+    mock_query_classid.return_value = [
+        Mock(dn="org-root/ls-sp1", pn_dn="sys/chassis-1/blade-1",
+             assoc_state="associated"),
+        Mock(dn="org-root/ls-sp2", pn_dn="", assoc_state="unassociated"),
+        Mock(dn="org-root/ls-sp3", pn_dn="sys/chassis-1/blade-3",
+             assoc_state="associating"),
+    ]
+    mock_commit.return_value = None
+
+    result = service_profile_power_set(
+        handle, ["org-root/ls-sp1", "org-root/ls-sp2", "org-root/ls-sp3",
+                 "org-root/ls-sp4"], "up")
+
+    assert_equal(result["success"], ["org-root/ls-sp1"])
+    assert_equal(sorted(result["failed"]),
+                 ["org-root/ls-sp2", "org-root/ls-sp3", "org-root/ls-sp4"])
+    mock_query_classid.assert_called_once_with("LsServer")
+    assert_equal(mock_commit.call_count, 1)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_ensure(mock_login, mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    mock_query_dns.return_value = {
+        "sys/rack-unit-1": _server_mo("sys/rack-unit-1", "org-root/ls-sp1",
+                                      oper_power="on"),
+        "sys/rack-unit-2": _server_mo("sys/rack-unit-2", "org-root/ls-sp2",
+                                      oper_power="off"),
+        "sys/rack-unit-3": _server_mo("sys/rack-unit-3", oper_power="off"),
+    }
+    mock_commit.return_value = None
+
+    result = server_power_ensure(
+        handle, [{"rack_id": 1}, {"rack_id": 2}, {"rack_id": 3}], "up")
+
+    assert_equal(result["skipped"], ["sys/rack-unit-1"])
+    assert_equal(result["changed"], ["sys/rack-unit-2"])
+    assert_equal(list(result["failed"]), ["sys/rack-unit-3"])
+    assert_equal(mock_commit.call_count, 1)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_ensure_no_change(mock_login, mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    mock_query_dns.return_value = {
+        "sys/rack-unit-1": _server_mo("sys/rack-unit-1", "org-root/ls-sp1",
+                                      oper_power="off"),
+    }
+
+    result = server_power_ensure(handle, ["sys/rack-unit-1"], "down")
+
+    assert_equal(result["skipped"], ["sys/rack-unit-1"])
+    assert_equal(result["changed"], [])
+    assert not mock_commit.called
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'query_classids')
+@patch.object(UcsHandle, 'login')
+def test_power_with_resolver(mock_login, mock_query_classids, mock_query_dn,
+                             mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    mock_query_classids.return_value = {
+        "ComputeBlade": [_server_mo("sys/chassis-1/blade-1",
+                                    "org-root/ls-sp1")],
+        "ComputeRackUnit": [_server_mo("sys/rack-unit-1", "org-root/ls-sp2")],
+    }
+    mock_commit.return_value = None
+
+    resolver = ServerResolver(handle)
+    server_power_on(handle, chassis_id=1, blade_id=1, resolver=resolver)
+    result = server_power_set_bulk(handle, [{"rack_id": 1}], "down",
+                                   resolver=resolver)
+
+    assert_equal(result["success"], ["sys/rack-unit-1"])
+    assert_equal(resolver.service_profile_dn_get("sys/rack-unit-1"),
+                 "org-root/ls-sp2")
+    assert_equal(mock_query_classids.call_count, 1)
+    assert not mock_query_dn.called
+    assert not mock_query_dns.called
+
+    resolver.invalidate()
+    resolver.server_get(rack_id=1)
+    assert_equal(mock_query_classids.call_count, 2)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'login')
+def test_power_set_fleet(mock_login, mock_query_dns, mock_commit):
+    mock_login.return_value = True
+    mock_query_dns.side_effect = lambda dns: dict(
+        (dn, _server_mo(dn, "org-root/ls-sp1")) for dn in dns)
+    mock_commit.return_value = None
+
+    pool = UcsHandlePool()
+    pool.add("ucsm-01", UcsHandle("1.1.1.1", "admin", "dummy"))
+    pool.add("ucsm-02", UcsHandle("1.1.1.2", "admin", "dummy"))
+    result = server_power_set_fleet(
+        pool, {"ucsm-01": [{"rack_id": 1}],
+               "ucsm-02": [{"rack_id": 2}],
+               "ucsm-03": [{"rack_id": 3}]}, "up", max_domains=2)
+
+    assert_equal(result["ucsm-01"]["result"]["success"], ["sys/rack-unit-1"])
+    assert_equal(result["ucsm-02"]["result"]["success"], ["sys/rack-unit-2"])
+    assert_equal(result["ucsm-03"]["result"], None)
+    assert "ucsm-03" in result["ucsm-03"]["error"]
+    assert_equal(mock_login.call_count, 2)
+
+
+@patch.object(UcsHandle, 'commit')
+@patch.object(UcsHandle, 'query_dns')
+@patch.object(UcsHandle, 'query_dn')
+@patch.object(UcsHandle, 'login')
+def test_power_dry_run(mock_login, mock_query_dn, mock_query_dns,
+                       mock_commit):
+    mock_login.return_value = True
+    handle.commit_buffer_discard()
+    mock_query_dn.return_value = _server_mo("sys/rack-unit-1",
+                                            "org-root/ls-sp1")
+    mock_query_dns.return_value = {
+        "sys/rack-unit-%d" % i: _server_mo("sys/rack-unit-%d" % i,
+                                           "org-root/ls-sp%d" % i)
+        for i in range(1, 4)}
+
+    payload = server_power_on(handle, rack_id=1, dry_run=True)
+
+    assert_equal(payload["mo_count"], 1)
+    assert 'dn="org-root/ls-sp1/power"' in payload["xml"]
+    assert 'state="up"' in payload["xml"]
+    assert_equal(payload["size"], len(payload["xml"]))
+
+    result = server_power_set_bulk(
+        handle, ["sys/rack-unit-%d" % i for i in range(1, 4)], "down",
+        batch_size=2, dry_run=True)
+
+    assert_equal([p["mo_count"] for p in result["dry_run"]], [2, 1])
+    assert_equal(len(result["success"]), 3)
+    assert not mock_commit.called
+    assert_equal(handle._get_commit_buf(), {})
@@ -0,0 +1,16 @@
+from nose.tools import assert_raises
+from nose.tools import assert_equal
+
+from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+
+from ucsm_apis.utils.mometa import mo_class_get
+
+
+def test_mo_class_get():
+    assert mo_class_get("AaaUser") is AaaUser
+    assert mo_class_get("AaaUser") is mo_class_get("AaaUser")
+    assert_equal(mo_class_get("LsbootEFIShell").__name__, "LsbootEFIShell")
+
+
+def test_mo_class_get_unknown():
+    assert_raises(ValueError, mo_class_get, "NoSuchClass")
@@ -0,0 +1,35 @@
+from nose.tools import assert_equal
+
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk.mometa.lsboot.LsbootPolicy import LsbootPolicy
+
+from ucsm_apis.utils.utils import commit_dry_run
+
+handle = UcsHandle("10.10.10.10", "username", "password")
+
+
+def test_commit_dry_run_hides_cookie():
+    handle.commit_buffer_discard()
+    handle._UcsSession__cookie = "1500000000/live-session-cookie"
+    handle.add_mo(LsbootPolicy("org-root", name="test"))
+
+    payload = commit_dry_run(handle)
+
+    assert "live-session-cookie" not in payload["xml"]
+    assert_equal(payload["mo_count"], 1)
+    assert_equal(handle._get_commit_buf(), {})
+
+
+def test_commit_dry_run_tag():
+    handle.commit_buffer_discard()
+    handle.add_mo(LsbootPolicy("org-root", name="untagged"))
+    handle.add_mo(LsbootPolicy("org-root", name="tagged"), tag="batch")
+
+    payload = commit_dry_run(handle, tag="batch")
+
+    assert "boot-policy-tagged" in payload["xml"]
+    assert "boot-policy-untagged" not in payload["xml"]
+    # the untagged buffer is left alone
+    assert_equal(list(handle._get_commit_buf()),
+                 ["org-root/boot-policy-untagged"])
+    handle.commit_buffer_discard()
@@ -15,7 +15,7 @@
 This module performs the operation related to Authentication management.
 """
 from ucsmsdk.ucsexception import UcsOperationError
-from ucsmsdk.mometa.aaa.AaaAuthRealm import AaaAuthRealm
+from ..utils.mometa import mo_class_get
 
 _auth_realm_dn = "sys/auth-realm"
 
@@ -63,7 +63,7 @@ def auth_domain_create(handle, name, refresh_period="600",
     Example:
         auth_domain_create(handle, name="ciscoucs")
     """
-    from ucsmsdk.mometa.aaa.AaaDomain import AaaDomain
+    AaaDomain = mo_class_get("AaaDomain")
 
     mo = AaaDomain(parent_mo_or_dn=_auth_realm_dn,
                    name=name,
@@ -184,7 +184,7 @@ def auth_domain_realm_configure(handle, domain_name, realm="local",
         auth_domain_realm_configure(handle, domain_name="ciscoucs",
                                     realm="ldap")
     """
-    from ucsmsdk.mometa.aaa.AaaDomainAuth import AaaDomainAuth
+    AaaDomainAuth = mo_class_get("AaaDomainAuth")
 
     obj = auth_domain_get(handle, domain_name,
                           caller="auth_domain_realm_configure")
@@ -268,7 +268,7 @@ def native_auth_configure(handle, def_role_policy=None,
         native_auth_configure(handle, def_role_policy="assign-default-role",
                               con_login="local")
     """
-    from ucsmsdk.mometa.aaa.AaaAuthRealm import AaaAuthRealm
+    AaaAuthRealm = mo_class_get("AaaAuthRealm")
 
     mo = AaaAuthRealm(parent_mo_or_dn="sys")
 
@@ -301,7 +301,7 @@ def native_auth_exists(handle, **kwargs):
     Example:
         native_auth_exists(handle, def_role_policy="assign-default-role")
     """
-    from ucsmsdk.mometa.aaa.AaaAuthRealm import AaaAuthRealm
+    AaaAuthRealm = mo_class_get("AaaAuthRealm")
 
     mo = AaaAuthRealm(parent_mo_or_dn="sys")
     mo = handle.query_dn(mo.dn)
@@ -341,7 +341,7 @@ def native_auth_default_configure(handle, realm="local", refresh_period="600",
     Example:
         native_auth_default_configure(handle, realm="radius")
     """
-    from ucsmsdk.mometa.aaa.AaaDefaultAuth import AaaDefaultAuth
+    AaaDefaultAuth = mo_class_get("AaaDefaultAuth")
 
     mo = AaaDefaultAuth(parent_mo_or_dn=_auth_realm_dn)
 
@@ -382,7 +382,7 @@ def native_auth_default_exists(handle, **kwargs):
     Example:
         native_auth_default_exists(handle, realm="radius")
     """
-    from ucsmsdk.mometa.aaa.AaaDefaultAuth import AaaDefaultAuth
+    AaaDefaultAuth = mo_class_get("AaaDefaultAuth")
 
     mo = AaaDefaultAuth(parent_mo_or_dn=_auth_realm_dn)
     mo = handle.query_dn(mo.dn)
@@ -425,7 +425,7 @@ def native_auth_console_configure(handle, realm="local", provider_group="",
     Example:
         native_auth_console_configure(handle, realm="local")
     """
-    from ucsmsdk.mometa.aaa.AaaConsoleAuth import AaaConsoleAuth
+    AaaConsoleAuth = mo_class_get("AaaConsoleAuth")
 
     mo = AaaConsoleAuth(parent_mo_or_dn=_auth_realm_dn)
 
@@ -464,7 +464,7 @@ def native_auth_console_exists(handle, **kwargs):
     Example:
         native_auth_console_exists(handle, realm="local")
     """
-    from ucsmsdk.mometa.aaa.AaaConsoleAuth import AaaConsoleAuth
+    AaaConsoleAuth = mo_class_get("AaaConsoleAuth")
 
     mo = AaaConsoleAuth(parent_mo_or_dn=_auth_realm_dn)
     mo = handle.query_dn(mo.dn)
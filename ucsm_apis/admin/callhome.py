@@ -15,6 +15,7 @@
 This module performs the operation related to callhome.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _base_dn = "call-home"
 
@@ -344,7 +345,7 @@ def callhome_profile_create(handle, name, format="xml", max_size="1000000",
     Example:
         callhome_profile_create(handle, name="callhomeprofile")
     """
-    from ucsmsdk.mometa.callhome.CallhomeProfile import CallhomeProfile
+    CallhomeProfile = mo_class_get("CallhomeProfile")
 
     mo = CallhomeProfile(parent_mo_or_dn=_base_dn,
                          name=name,
@@ -499,7 +500,7 @@ def callhome_profile_email_add(handle, profile_name, email, **kwargs):
         callhome_profile_email_add(handle, profile_name="callhomeprofile",
                                     email="ciscoucs@cisco.com")
     """
-    from ucsmsdk.mometa.callhome.CallhomeDest import CallhomeDest
+    CallhomeDest = mo_class_get("CallhomeDest")
 
     profile = callhome_profile_get(handle, profile_name,
                                     caller="callhome_profile_email_add")
@@ -642,7 +643,7 @@ def callhome_policy_create(handle, cause, admin_state="enabled",
         callhome_policy_create(handle, cause="equipment-removed",
                                 "name="callhomepolicy")
     """
-    from ucsmsdk.mometa.callhome.CallhomePolicy import CallhomePolicy
+    CallhomePolicy = mo_class_get("CallhomePolicy")
 
     mo = CallhomePolicy(parent_mo_or_dn=_base_dn,
                         cause=cause,
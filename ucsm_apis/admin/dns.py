@@ -15,6 +15,7 @@
 This module performs the operation related to dns server management.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _dns_svc_dn = "sys/svc-ext/dns-svc"
 
@@ -58,7 +59,7 @@ def dns_server_add(handle, name, descr=None, **kwargs):
         mo = dns_server_add(handle, name="8.8.8.8", descr="dns_google")
     """
 
-    from ucsmsdk.mometa.comm.CommDnsProvider import CommDnsProvider
+    CommDnsProvider = mo_class_get("CommDnsProvider")
 
     mo = CommDnsProvider(
         parent_mo_or_dn=_dns_svc_dn,
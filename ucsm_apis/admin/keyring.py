@@ -15,6 +15,7 @@
 This module performs the operation related to key management.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _keyring_base_dn = "sys/pki-ext"
 _tp_base_dn = "sys/pki-ext"
@@ -50,7 +51,7 @@ def key_ring_create(handle, name, modulus="mod2048", regen="no",
     Example:
         key_ring = key_ring_create(handle, name="mykeyring", regen="yes")
     """
-    from ucsmsdk.mometa.pki.PkiKeyRing import PkiKeyRing
+    PkiKeyRing = mo_class_get("PkiKeyRing")
 
     mo = PkiKeyRing(parent_mo_or_dn=_keyring_base_dn,
                     name=name,
@@ -210,7 +211,7 @@ def certificate_request_create(handle, name,
         certificate_request_create(handle, name="mykeyring", dns="10.10.10.100",
                                 country="IN")
     """
-    from ucsmsdk.mometa.pki.PkiCertReq import PkiCertReq
+    PkiCertReq = mo_class_get("PkiCertReq")
 
     obj = key_ring_get(handle, name, caller="certificate_request_create")
     mo = PkiCertReq(parent_mo_or_dn=obj, dns=dns,
@@ -335,7 +336,7 @@ def trusted_point_create(handle, name, policy_owner="local",
     Example:
         trusted_point = trusted_point_create(handle, name="mytrustedpoint")
     """
-    from ucsmsdk.mometa.pki.PkiTP import PkiTP
+    PkiTP = mo_class_get("PkiTP")
 
     mo = PkiTP(parent_mo_or_dn=_tp_base_dn,
                name=name,
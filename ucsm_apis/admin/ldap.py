@@ -15,6 +15,7 @@
 This module performs the operation related to ldap.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 from ..admin.locale import locale_get, locale_exists
 
 _ldap_dn = "sys/ldap-ext"
@@ -124,7 +125,7 @@ def ldap_provider_create(handle, name, order="lowest-available", rootdn=None,
         ldap_provider_create(handle, name="test_ldap_prov", port="320",
                              order="3")
     """
-    from ucsmsdk.mometa.aaa.AaaLdapProvider import AaaLdapProvider
+    AaaLdapProvider = mo_class_get("AaaLdapProvider")
 
     mo = AaaLdapProvider(parent_mo_or_dn=_ldap_dn,
                          name=name,
@@ -290,7 +291,7 @@ def ldap_provider_group_rules_configure(handle, ldap_provider_name,
                                         ldap_provider_name="test_ldap_prov",
                                         authorization="enable")
     """
-    from ucsmsdk.mometa.aaa.AaaLdapGroupRule import AaaLdapGroupRule
+    AaaLdapGroupRule = mo_class_get("AaaLdapGroupRule")
 
     obj = ldap_provider_get(handle, ldap_provider_name,
                             "ldap_provider_group_rules_configure")
@@ -358,7 +359,7 @@ def ldap_group_create(handle, name, descr=None, **kwargs):
     Example:
         ldap_group_create(handle, name="test_ldap_grp_map")
     """
-    from ucsmsdk.mometa.aaa.AaaLdapGroup import AaaLdapGroup
+    AaaLdapGroup = mo_class_get("AaaLdapGroup")
 
     mo = AaaLdapGroup(parent_mo_or_dn=_ldap_dn, name=name, descr=descr)
     mo.set_prop_multiple(**kwargs)
@@ -463,7 +464,7 @@ def ldap_group_role_add(handle, ldap_group_name, name, descr=None,
         ldap_group_role_add(
           handle, ldap_group_name="test_ldap_grp_map", name="storage")
     """
-    from ucsmsdk.mometa.aaa.AaaUserRole import AaaUserRole
+    AaaUserRole = mo_class_get("AaaUserRole")
     from ..admin.role import role_get
 
     role = role_get(handle, name=name)
@@ -589,7 +590,7 @@ def ldap_group_locale_add(handle, ldap_group_name, name, descr=None,
         ldap_group_locale_add(
           handle, ldap_group_name="test_ldap_grp_map", name="locale1")
     """
-    from ucsmsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+    AaaUserLocale = mo_class_get("AaaUserLocale")
     from ..admin.locale import locale_get
 
     locale = locale_get(handle, name, caller="ldap_group_locale_add")
@@ -713,7 +714,7 @@ def ldap_provider_group_create(handle, name, descr=None, **kwargs):
     Example:
         ldap_provider_group_create(handle, name="test_ldap_group")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderGroup import AaaProviderGroup
+    AaaProviderGroup = mo_class_get("AaaProviderGroup")
 
     mo = AaaProviderGroup(parent_mo_or_dn=_ldap_dn,
                           name=name,
@@ -832,7 +833,7 @@ def ldap_provider_group_provider_add(handle, group_name, name,
                                         name="test_ldap_provider",
                                         order="1")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderRef import AaaProviderRef
+    AaaProviderRef = mo_class_get("AaaProviderRef")
 
     ldap_provider = ldap_provider_get(handle, name=name,
                                     caller="ldap_provider_group_provider_add")
@@ -14,7 +14,10 @@
 """
 This module performs the operation related to dns server management.
 """
+from ucsmsdk.ucsexception import UcsException
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
+from ..utils.utils import commit_dry_run
 
 _base_dn = "sys/user-ext"
 
@@ -40,7 +43,7 @@ def locale_create(handle, name, policy_owner="local", descr=None, **kwargs):
     Example:
         locale_create(handle, name="test_locale")
     """
-    from ucsmsdk.mometa.aaa.AaaLocale import AaaLocale
+    AaaLocale = mo_class_get("AaaLocale")
 
     mo = AaaLocale(parent_mo_or_dn=_base_dn,
                    name=name,
@@ -179,7 +182,7 @@ def locale_org_assign(handle, locale_name, name, org_dn="org-root", descr=None,
         locale_org_assign(handle, locale_name="test_locale",
                           name="test_org_assign")
     """
-    from ucsmsdk.mometa.aaa.AaaOrg import AaaOrg
+    AaaOrg = mo_class_get("AaaOrg")
 
     locale = locale_get(handle, locale_name, caller="locale_org_assign")
 
@@ -254,3 +257,150 @@ def locale_org_unassign(handle, locale_name, name):
     handle.remove_mo(mo)
     handle.commit()
 
+
+def _locale_org_dn_get(assignment, caller):
+    # returns the AaaOrg dn of a {"locale_name", "name"} assignment
+    if not isinstance(assignment, dict) or \
+            not assignment.get("locale_name") or not assignment.get("name"):
+        raise UcsOperationError(caller, "Invalid assignment '%s', locale_name "
+                                        "and name are mandatory"
+                                % (assignment,))
+    return _base_dn + "/locale-" + assignment["locale_name"] + "/org-" + \
+        assignment["name"]
+
+
+def _locale_org_commit(handle, dns, result, dry_run=False):
+    if dry_run:
+        result["dry_run"] = [commit_dry_run(handle)]
+    else:
+        try:
+            handle.commit()
+        except UcsException as err:
+            handle.commit_buffer_discard()
+            for dn in dns:
+                result["failed"][dn] = str(err)
+            return
+    result["success"].extend(dns)
+
+
+def locale_org_assign_bulk(handle, assignments, dry_run=False):
+    """
+    assigns many orgs to locales in a single commit
+
+    All locales and orgs are validated with a single query.
+
+    Args:
+        handle (UcsHandle)
+        assignments (list of dict): each dict holds the locale_org_assign
+         arguments locale_name, name and optionally org_dn, descr and any
+         other AaaOrg property
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict
+
+    Returns:
+        dict: {"success": [AaaOrg dn, ...],
+               "failed": {AaaOrg dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if an assignment is missing mandatory keys
+
+    Example:
+        locale_org_assign_bulk(handle,
+                               assignments=[
+                                   {"locale_name": "test_locale",
+                                    "name": "finance",
+                                    "org_dn": "org-root/org-finance"},
+                                   {"locale_name": "test_locale",
+                                    "name": "hr",
+                                    "org_dn": "org-root/org-hr"}])
+    """
+    AaaOrg = mo_class_get("AaaOrg")
+
+    dns = [_locale_org_dn_get(assignment, "locale_org_assign_bulk")
+           for assignment in assignments]
+
+    class_mos = handle.query_classids("AaaLocale", "OrgOrg")
+    locale_dns = set(mo.dn for mo in class_mos.get("AaaLocale", []))
+    org_dns = set(mo.dn for mo in class_mos.get("OrgOrg", []))
+
+    result = {"success": [], "failed": {}}
+    staged_dns = []
+    for dn, assignment in zip(dns, assignments):
+        props = dict(assignment)
+        locale_name = props.pop("locale_name")
+        name = props.pop("name")
+        org_dn = props.pop("org_dn", "org-root")
+        locale_dn = _base_dn + "/locale-" + locale_name
+        if locale_dn not in locale_dns:
+            result["failed"][dn] = str(UcsOperationError(
+                "locale_org_assign_bulk",
+                "Locale '%s' does not exist" % locale_dn))
+            continue
+        if org_dn not in org_dns:
+            result["failed"][dn] = str(UcsOperationError(
+                "locale_org_assign_bulk",
+                "org '%s' does not exist" % org_dn))
+            continue
+
+        try:
+            mo = AaaOrg(parent_mo_or_dn=locale_dn, name=name, org_dn=org_dn)
+            mo.set_prop_multiple(**props)
+        except ValueError as err:
+            result["failed"][dn] = str(err)
+            continue
+        handle.add_mo(mo, modify_present=True)
+        staged_dns.append(dn)
+
+    if staged_dns:
+        _locale_org_commit(handle, staged_dns, result, dry_run)
+    return result
+
+
+def locale_org_unassign_bulk(handle, assignments, dry_run=False):
+    """
+    unassigns many orgs from locales in a single commit
+
+    All org assignments are fetched with a single query.
+
+    Args:
+        handle (UcsHandle)
+        assignments (list of dict): each dict holds the locale_org_unassign
+         arguments locale_name and name
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict
+
+    Returns:
+        dict: {"success": [AaaOrg dn, ...],
+               "failed": {AaaOrg dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if an assignment is missing mandatory keys
+
+    Example:
+        locale_org_unassign_bulk(handle,
+                                 assignments=[
+                                     {"locale_name": "test_locale",
+                                      "name": "finance"},
+                                     {"locale_name": "test_locale",
+                                      "name": "hr"}])
+    """
+    dns = [_locale_org_dn_get(assignment, "locale_org_unassign_bulk")
+           for assignment in assignments]
+
+    existing = dict((mo.dn, mo) for mo in handle.query_classid("AaaOrg"))
+
+    result = {"success": [], "failed": {}}
+    staged_dns = []
+    for dn in dns:
+        mo = existing.get(dn)
+        if mo is None:
+            result["failed"][dn] = str(UcsOperationError(
+                "locale_org_unassign_bulk",
+                "org '%s' not assigned to locale" % dn))
+            continue
+        handle.remove_mo(mo)
+        staged_dns.append(dn)
+
+    if staged_dns:
+        _locale_org_commit(handle, staged_dns, result, dry_run)
+    return result
@@ -15,6 +15,7 @@
 This module performs the operation related to radius configuration.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _radius_dn = "sys/radius-ext"
 
@@ -48,7 +49,7 @@ def radius_provider_create(handle, name, order="lowest-available", key=None,
         radius_provider_create(handle, name="test_radius_prov",
                                auth_port="320", timeout="10")
     """
-    from ucsmsdk.mometa.aaa.AaaRadiusProvider import AaaRadiusProvider
+    AaaRadiusProvider = mo_class_get("AaaRadiusProvider")
 
     mo = AaaRadiusProvider(
         parent_mo_or_dn=_radius_dn,
@@ -195,7 +196,7 @@ def radius_provider_group_create(handle, name, descr=None, **kwargs):
     Example:
         radius_provider_group_create(handle, name="test_prov_grp")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderGroup import AaaProviderGroup
+    AaaProviderGroup = mo_class_get("AaaProviderGroup")
 
     mo = AaaProviderGroup(parent_mo_or_dn=_radius_dn, name=name, descr=descr)
     mo.set_prop_multiple(**kwargs)
@@ -309,7 +310,7 @@ def radius_provider_group_provider_add(handle, group_name, name,
         radius_provider_group_provider_add(
           handle, group_name="test_prov_grp", name="test_radius_prov")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderRef import AaaProviderRef
+    AaaProviderRef = mo_class_get("AaaProviderRef")
 
     radius_provider = radius_provider_get(handle, name,
                                 caller="radius_provider_group_provider_add")
@@ -14,7 +14,12 @@
 """
 This module performs the operation related to role.
 """
+from ucsmsdk.ucsexception import UcsException
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
+from ..utils.utils import commit_dry_run
+
+import six
 
 _user_dn = "sys/user-ext"
 
@@ -53,7 +58,7 @@ def role_create(handle, name, priv="read-only", policy_owner="local",
     Example:
         role_create(handle, name="test_role", priv="admin")
     """
-    from ucsmsdk.mometa.aaa.AaaRole import AaaRole
+    AaaRole = mo_class_get("AaaRole")
 
     mo = AaaRole(parent_mo_or_dn=_user_dn,
                  name=name,
@@ -167,3 +172,139 @@ def role_delete(handle, name):
     mo = role_get(handle, name, caller="role_delete")
     handle.remove_mo(mo)
     handle.commit()
+
+
+# roles predefined by UCSM, role_sync never deletes them
+_role_builtin = ("aaa", "admin", "facility-manager", "network", "operations",
+                 "read-only", "server-compute", "server-equipment",
+                 "server-profile", "server-security", "storage")
+
+
+def _priv_canonical_get(priv):
+    # priv is a comma separated string or a list, order and duplicates
+    # do not matter to UCSM
+    if priv is None:
+        return None
+    if isinstance(priv, six.string_types):
+        priv = priv.split(',')
+    return ",".join(sorted(set(p.strip() for p in priv if p.strip())))
+
+
+def _role_sync_stage(handle, role_mo, name, props):
+    # stages the role if it is missing or differs, returns the result key
+    AaaRole = mo_class_get("AaaRole")
+
+    props = dict(props)
+    priv = _priv_canonical_get(props.pop("priv", None))
+    if role_mo is None:
+        mo = AaaRole(parent_mo_or_dn=_user_dn, name=name,
+                     priv=priv or "read-only")
+        mo.set_prop_multiple(**props)
+        handle.add_mo(mo, modify_present=True)
+        return "created"
+
+    changed = dict((prop, value) for prop, value in props.items()
+                   if value is not None and
+                   not role_mo.check_prop_match(**{prop: value}))
+    if priv is not None and priv != _priv_canonical_get(role_mo.priv):
+        changed["priv"] = priv
+    if not changed:
+        return "unchanged"
+
+    # a stub with only the changed properties
+    mo = AaaRole(parent_mo_or_dn=_user_dn, name=name)
+    mo.set_prop_multiple(**changed)
+    handle.add_mo(mo, modify_present=True)
+    return "modified"
+
+
+def role_sync(handle, desired_roles, delete_extra=False, dry_run=False):
+    """
+    makes the roles on UCSM match a list of desired roles
+
+    All roles are fetched with a single query. The comma separated priv
+    values are compared in canonical form, so their order does not matter.
+    Only the roles which really changed are committed, in a single commit.
+
+    Args:
+        handle (UcsHandle)
+        desired_roles (list of dict): each dict holds the role name,
+         priv as a comma separated string or a list, and optionally any
+         other role_create argument
+        delete_extra (bool): if True, roles not in desired_roles are deleted
+         roles predefined by UCSM are never deleted.
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict
+
+    Returns:
+        dict: {"created": [role name, ...],
+               "modified": [role name, ...],
+               "deleted": [role name, ...],
+               "unchanged": [role name, ...],
+               "failed": {role name: error message, ...}}
+
+    Raises:
+        UcsOperationError: if a desired role has no name or is given twice
+
+    Example:
+        role_sync(handle,
+                  desired_roles=[{"name": "test_role",
+                                  "priv": "ls-server,ls-network"},
+                                 {"name": "auditor",
+                                  "priv": ["read-only", "fault"]}])
+    """
+    specs = []
+    names = set()
+    for role in desired_roles:
+        if not isinstance(role, dict) or not role.get("name"):
+            raise UcsOperationError("role_sync", "Invalid role '%s', name is "
+                                                 "mandatory" % (role,))
+        props = dict(role)
+        name = props.pop("name")
+        if name in names:
+            raise UcsOperationError("role_sync", "Role '%s' is given more "
+                                                 "than once" % name)
+        names.add(name)
+        specs.append((name, props))
+
+    existing_roles = dict((mo.name, mo)
+                          for mo in handle.query_classid("AaaRole"))
+
+    result = {"created": [], "modified": [], "deleted": [], "unchanged": [],
+              "failed": {}}
+    staged = []
+    for name, props in specs:
+        try:
+            key = _role_sync_stage(handle, existing_roles.get(name), name,
+                                   props)
+        except ValueError as err:
+            result["failed"][name] = str(err)
+            continue
+        if key == "unchanged":
+            result[key].append(name)
+        else:
+            staged.append((name, key))
+
+    if delete_extra:
+        for name, mo in sorted(existing_roles.items()):
+            if name in names or name in _role_builtin:
+                continue
+            handle.remove_mo(mo)
+            staged.append((name, "deleted"))
+
+    if not staged:
+        return result
+
+    if dry_run:
+        result["dry_run"] = [commit_dry_run(handle)]
+    else:
+        try:
+            handle.commit()
+        except UcsException as err:
+            handle.commit_buffer_discard()
+            for name, _ in staged:
+                result["failed"][name] = str(err)
+            return result
+    for name, key in staged:
+        result[key].append(name)
+    return result
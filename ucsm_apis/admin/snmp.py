@@ -15,6 +15,7 @@
 This module performs the operation related to snmp server, user and traps.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _base_dn = "sys/svc-ext"
 
@@ -198,7 +199,7 @@ def snmp_trap_add(handle, hostname, community, port="162", version="v2c",
                       version="v2c",
                       notification_type="informs")
     """
-    from ucsmsdk.mometa.comm.CommSnmpTrap import CommSnmpTrap
+    CommSnmpTrap = mo_class_get("CommSnmpTrap")
 
     if version == 'v1':
         notification_type = 'traps'
@@ -360,7 +361,7 @@ def snmp_user_add(handle, name, pwd, auth="md5", use_aes="no",
         snmp_user_add(handle, name="snmpuser", descr=None, pwd="password",
                       privpwd="password", auth="sha")
     """
-    from ucsmsdk.mometa.comm.CommSnmpUser import CommSnmpUser
+    CommSnmpUser = mo_class_get("CommSnmpUser")
 
     mo = CommSnmpUser(
         parent_mo_or_dn=_base_dn + "/snmp-svc",
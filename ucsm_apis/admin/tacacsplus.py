@@ -14,6 +14,7 @@
 This module performs the operation related to dns server management.
 """
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _tacacs_dn = "sys/tacacs-ext"
 
@@ -48,8 +49,7 @@ def tacacsplus_provider_create(handle, name, order="lowest-available",
         tacacsplus_provider_create(
           handle, name="test_tacac_prov", port="320", timeout="10")
     """
-    from ucsmsdk.mometa.aaa.AaaTacacsPlusProvider import \
-        AaaTacacsPlusProvider
+    AaaTacacsPlusProvider = mo_class_get("AaaTacacsPlusProvider")
 
     mo = AaaTacacsPlusProvider(parent_mo_or_dn=_tacacs_dn,
                                name=name,
@@ -199,7 +199,7 @@ def tacacsplus_provider_group_create(handle, name, descr=None, **kwargs):
     Example:
         tacacsplus_provider_group_create(handle, name="test_prov_grp")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderGroup import AaaProviderGroup
+    AaaProviderGroup = mo_class_get("AaaProviderGroup")
 
     mo = AaaProviderGroup(parent_mo_or_dn=_tacacs_dn, name=name, descr=descr)
     mo.set_prop_multiple(**kwargs)
@@ -315,7 +315,7 @@ def tacacsplus_provider_group_provider_add(handle, group_name, name,
                                                group_name="test_prov_grp",
                                                name="test_tacac_prov")
     """
-    from ucsmsdk.mometa.aaa.AaaProviderRef import AaaProviderRef
+    AaaProviderRef = mo_class_get("AaaProviderRef")
 
     tacacsplus_provider = tacacsplus_provider_get(handle, name,
                             caller="tacacsplus_provider_group_provider_add")
@@ -11,6 +11,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
 
 _base_dn = "sys/svc-ext"
 
@@ -113,7 +114,7 @@ def ntp_server_add(handle, name, descr=None, **kwargs):
     Example:
         ntp_server_add(handle, name="72.163.128.140", descr="Default NTP")
     """
-    from ucsmsdk.mometa.comm.CommNtpProvider import CommNtpProvider
+    CommNtpProvider = mo_class_get("CommNtpProvider")
 
     dn = _base_dn + "/datetime-svc"
     mo = CommNtpProvider(parent_mo_or_dn=dn,
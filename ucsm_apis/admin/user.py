@@ -14,7 +14,15 @@
 """
 This module performs the operation related to user.
 """
+import functools
+
+from ucsmsdk.ucsexception import UcsException
 from ucsmsdk.ucsexception import UcsOperationError
+from ..utils.mometa import mo_class_get
+from ..utils.utils import chunks
+from ..utils.utils import commit_dry_run
+
+import six
 
 _base_dn = "sys/user-ext"
 
@@ -65,7 +73,7 @@ def user_create(handle, name, pwd=None, clear_pwd_history="no",
                   expiration="2016-01-13T00:00:00", enc_pwd=None,
                   account_status="active")
     """
-    from ucsmsdk.mometa.aaa.AaaUser import AaaUser
+    AaaUser = mo_class_get("AaaUser")
 
     mo = AaaUser(parent_mo_or_dn=_base_dn,
                  name=name,
@@ -203,11 +211,321 @@ def user_delete(handle, name):
     handle.remove_mo(mo)
     handle.commit()
 
+
+# defaults applied when a desired user is created, same as user_create
+_user_create_defaults = {"clear_pwd_history": "no",
+                         "pwd_life_time": "no-password-expire",
+                         "account_status": "active",
+                         "expires": "no",
+                         "expiration": "never",
+                         "enc_pwd_set": "no"}
+
+# write only properties, these can not be compared with UCSM and are only
+# applied when the user is created
+_user_pwd_props = ("pwd", "enc_pwd")
+
+# UCSM keeps these, user_sync never deletes them
+_user_protected = ("admin",)
+_user_role_implicit = "read-only"
+
+
+def _names_get(names):
+    # roles and locales are given as a list or a comma separated string
+    if names is None:
+        return None
+    if isinstance(names, six.string_types):
+        names = names.split(',')
+    return sorted(set(name.strip() for name in names if name.strip()))
+
+
+def _user_spec_get(user, caller):
+    # splits a desired user dict into name, AaaUser properties, roles and
+    # locales, roles/locales are None if the dict leaves them unmanaged
+    if not isinstance(user, dict) or not user.get("name"):
+        raise UcsOperationError(caller, "Invalid user '%s', name is "
+                                        "mandatory" % (user,))
+    props = dict(user)
+    name = props.pop("name")
+    roles = _names_get(props.pop("roles", None))
+    locales = _names_get(props.pop("locales", None))
+    return name, props, roles, locales
+
+
+def _user_specs_get(users, caller):
+    specs = []
+    names = set()
+    for user in users:
+        spec = _user_spec_get(user, caller)
+        if spec[0] in names:
+            raise UcsOperationError(caller, "User '%s' is given more than "
+                                            "once" % spec[0])
+        names.add(spec[0])
+        specs.append(spec)
+    return specs
+
+
+def _user_tree_get(name, props, roles, locales):
+    # builds an AaaUser with its roles and locales locally
+    AaaUser = mo_class_get("AaaUser")
+    AaaUserRole = mo_class_get("AaaUserRole")
+    AaaUserLocale = mo_class_get("AaaUserLocale")
+
+    user_props = dict(_user_create_defaults)
+    user_props.update(props)
+    mo = AaaUser(parent_mo_or_dn=_base_dn, name=name, **user_props)
+    for role in roles or []:
+        AaaUserRole(parent_mo_or_dn=mo, name=role)
+    for locale in locales or []:
+        AaaUserLocale(parent_mo_or_dn=mo, name=locale)
+    return mo
+
+
+def _user_create_stage(handle, name, props, roles, locales):
+    handle.add_mo(_user_tree_get(name, props, roles, locales),
+                  modify_present=True)
+    return True
+
+
+def _users_get(handle):
+    # fetches every AaaUser with its roles and locales in one round trip
+    response = handle.query_classid("AaaUser", hierarchy=True,
+                                    need_response=True)
+    return dict((mo.name, mo) for mo in response.out_configs.child
+                if mo.get_class_id() == "AaaUser")
+
+
+def _user_children_get(user_mo, class_id):
+    return dict((mo.name, mo) for mo in user_mo.child
+                if mo.get_class_id() == class_id)
+
+
+def _user_props_diff(user_mo, props):
+    # returns the properties which differ, None values are ignored
+    changed = {}
+    for prop, value in props.items():
+        if prop in _user_pwd_props or value is None:
+            continue
+        if not user_mo.check_prop_match(**{prop: value}):
+            changed[prop] = value
+    return changed
+
+
+def _user_sync_stage(handle, user_mo, props, roles, locales):
+    # stages the changes needed on an existing user, returns True if
+    # anything was staged
+    AaaUser = mo_class_get("AaaUser")
+    AaaUserRole = mo_class_get("AaaUserRole")
+    AaaUserLocale = mo_class_get("AaaUserLocale")
+
+    changed = _user_props_diff(user_mo, props)
+    existing_roles = _user_children_get(user_mo, "AaaUserRole")
+    existing_locales = _user_children_get(user_mo, "AaaUserLocale")
+
+    roles_add = roles_remove = locales_add = locales_remove = []
+    if roles is not None:
+        roles_add = [role for role in roles if role not in existing_roles]
+        roles_remove = [mo for role, mo in sorted(existing_roles.items())
+                        if role not in roles and
+                        role != _user_role_implicit]
+    if locales is not None:
+        locales_add = [locale for locale in locales
+                       if locale not in existing_locales]
+        locales_remove = [mo for locale, mo in
+                          sorted(existing_locales.items())
+                          if locale not in locales]
+
+    if not (changed or roles_add or roles_remove or locales_add or
+            locales_remove):
+        return False
+
+    # a stub with only the changed properties, so the rest of the user is
+    # not sent back to UCSM
+    mo = AaaUser(parent_mo_or_dn=_base_dn, name=user_mo.name, **changed)
+    for role in roles_add:
+        AaaUserRole(parent_mo_or_dn=mo, name=role)
+    for locale in locales_add:
+        AaaUserLocale(parent_mo_or_dn=mo, name=locale)
+    handle.add_mo(mo, modify_present=True)
+    for child in roles_remove + locales_remove:
+        handle.remove_mo(child)
+    return True
+
+
+def _users_commit(handle, batch, result, dry_run=False):
+    # batch is a list of (user name, result key)
+    if dry_run:
+        result.setdefault("dry_run", []).append(commit_dry_run(handle))
+    else:
+        try:
+            handle.commit()
+        except UcsException as err:
+            handle.commit_buffer_discard()
+            for name, _ in batch:
+                result["failed"][name] = str(err)
+            return
+    for name, key in batch:
+        result[key].append(name)
+
+
+def user_sync(handle, desired_users, delete_extra=False, batch_size=100,
+              dry_run=False):
+    """
+    makes the local users on UCSM match a list of desired users
+
+    All users are fetched with their roles and locales in a single query.
+    Missing users are created, users which differ are modified and, with
+    delete_extra, users not in desired_users are deleted, with one commit
+    per batch of users.
+
+    Args:
+        handle (UcsHandle)
+        desired_users (list of dict): each dict holds the user name, any
+         user_create argument and optionally
+         roles (list or comma separated string) and
+         locales (list or comma separated string).
+         If roles or locales are left out, they are not changed on existing
+         users. pwd and enc_pwd are only used when the user is created.
+        delete_extra (bool): if True, users not in desired_users are deleted
+         'admin' and the user of the handle session are never deleted.
+        batch_size (int): maximum number of users per commit
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"created": [user name, ...],
+               "modified": [user name, ...],
+               "deleted": [user name, ...],
+               "unchanged": [user name, ...],
+               "failed": {user name: error message, ...}}
+
+    Raises:
+        UcsOperationError: if a desired user has no name or is given twice
+
+    Example:
+        user_sync(handle,
+                  desired_users=[{"name": "test", "pwd": "p@ssw0rd",
+                                  "first_name": "firstname",
+                                  "roles": ["admin", "read-only"],
+                                  "locales": "testlocale"},
+                                 {"name": "operator",
+                                  "roles": "operations"}])
+    """
+    specs = _user_specs_get(desired_users, "user_sync")
+    existing_users = _users_get(handle)
+
+    result = {"created": [], "modified": [], "deleted": [], "unchanged": [],
+              "failed": {}}
+
+    actions = []
+    for name, props, roles, locales in specs:
+        user_mo = existing_users.get(name)
+        if user_mo is None:
+            actions.append((name, "created", functools.partial(
+                _user_create_stage, handle, name, props, roles, locales)))
+        else:
+            actions.append((name, "modified", functools.partial(
+                _user_sync_stage, handle, user_mo, props, roles, locales)))
+
+    if delete_extra:
+        # deleting the session user would lock the caller out mid sync
+        protected = set(_user_protected) | set([handle.username])
+        desired_names = set(spec[0] for spec in specs)
+        for name, user_mo in sorted(existing_users.items()):
+            if name in desired_names or name in protected:
+                continue
+            actions.append((name, "deleted", functools.partial(
+                handle.remove_mo, user_mo)))
+
+    for action_batch in chunks(actions, batch_size):
+        batch = []
+        for name, key, stage in action_batch:
+            try:
+                staged = stage()
+            except ValueError as err:
+                result["failed"][name] = str(err)
+                continue
+            if staged is False:
+                result["unchanged"].append(name)
+                continue
+            batch.append((name, key))
+        if batch:
+            _users_commit(handle, batch, result, dry_run)
+    return result
+
+
+def user_create_bulk(handle, users, batch_size=100, dry_run=False):
+    """
+    creates many users with their roles and locales
+
+    Each user is built locally together with its roles and locales and
+    committed with the other users of its batch. All roles and locales are
+    checked for existence, and the users for absence, with a single query.
+    Users which already exist are reported as failed and left untouched,
+    use user_sync to modify them.
+
+    Args:
+        handle (UcsHandle)
+        users (list of dict): users in the user_sync desired_users format,
+         missing properties get the user_create defaults
+        batch_size (int): maximum number of users per commit
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"created": [user name, ...],
+               "failed": {user name: error message, ...}}
+
+    Raises:
+        UcsOperationError: if a user has no name or is given twice
+
+    Example:
+        user_create_bulk(handle,
+                         users=[{"name": "test", "pwd": "p@ssw0rd",
+                                 "roles": "admin,read-only",
+                                 "locales": ["testlocale"]},
+                                {"name": "operator", "pwd": "p@ssw0rd",
+                                 "roles": ["operations"]}])
+    """
+    specs = _user_specs_get(users, "user_create_bulk")
+
+    class_mos = handle.query_classids("AaaRole", "AaaLocale", "AaaUser")
+    known_roles = set(mo.name for mo in class_mos.get("AaaRole", []))
+    known_locales = set(mo.name for mo in class_mos.get("AaaLocale", []))
+    known_users = set(mo.name for mo in class_mos.get("AaaUser", []))
+
+    result = {"created": [], "failed": {}}
+    for spec_batch in chunks(specs, batch_size):
+        batch = []
+        for name, props, roles, locales in spec_batch:
+            if name in known_users:
+                result["failed"][name] = str(UcsOperationError(
+                    "user_create_bulk", "User '%s' already exists" % name))
+                continue
+            missing = ["role '%s'" % role for role in roles or []
+                       if role not in known_roles]
+            missing += ["locale '%s'" % locale for locale in locales or []
+                        if locale not in known_locales]
+            if missing:
+                result["failed"][name] = str(UcsOperationError(
+                    "user_create_bulk",
+                    "%s does not exist" % ", ".join(missing)))
+                continue
+            try:
+                _user_create_stage(handle, name, props, roles, locales)
+            except ValueError as err:
+                result["failed"][name] = str(err)
+                continue
+            batch.append((name, "created"))
+        if batch:
+            _users_commit(handle, batch, result, dry_run)
+    return result
+
+
 def _user_role_add(handle, user_mo, name, descr=None, **kwargs):
     """
     adds single role to an user
     """
-    from ucsmsdk.mometa.aaa.AaaUserRole import AaaUserRole
+    AaaUserRole = mo_class_get("AaaUserRole")
 
     mo = AaaUserRole(parent_mo_or_dn=user_mo, name=name, descr=descr)
     mo.set_prop_multiple(**kwargs)
@@ -236,8 +554,6 @@ def user_role_add(handle, user_name, name, descr=None, **kwargs):
     Example:
         user_role_add(handle, user_name="test", name="admin")
     """
-    from ucsmsdk.mometa.aaa.AaaUserRole import AaaUserRole
-
     user = user_get(handle, user_name, "user_role_add")
 
     roles = [role.strip() for role in name.split(',')]
@@ -277,19 +593,23 @@ def user_role_get(handle, user_name, name, caller="user_role_get"):
     return mo
 
 
-def _user_role_exists(handle, user_name, name, **kwargs):
-    try:
-        mo = user_role_get(handle, user_name, name, "user_role_exists")
-    except UcsOperationError:
-        return (False, None)
-    mo_exists = mo.check_prop_match(**kwargs)
-    return (mo_exists, mo if mo_exists else None)
+def _user_roles_match(roles_mo, names, **kwargs):
+    # roles_mo is {role name: AaaUserRole} of one user
+    matched = []
+    for name in names:
+        mo = roles_mo.get(name)
+        if mo is None or not mo.check_prop_match(**kwargs):
+            return False, None
+        matched.append(mo)
+    return True, matched
 
 
 def user_role_exists(handle, user_name, name, **kwargs):
     """
     check if role is already added to user
 
+    All roles of the user are fetched with a single query.
+
     Args:
         handle (UcsHandle)
         user_name (string): username
@@ -307,15 +627,52 @@ def user_role_exists(handle, user_name, name, **kwargs):
     Example:
         user_role_exists(handle, user_name="test", name="admin")
     """
+    user_dn = _base_dn + "/user-" + user_name
+    roles_mo = dict((mo.name, mo) for mo in
+                    handle.query_children(in_dn=user_dn,
+                                          class_id="AaaUserRole"))
     roles = [role.strip() for role in name.split(',')]
-    roles_mo = []
-    for role in roles:
-        status, mo = _user_role_exists(handle, user_name, role, **kwargs)
-        if status is False:
-            return False, None
-        roles_mo.append(mo)
+    return _user_roles_match(roles_mo, roles, **kwargs)
 
-    return True, roles_mo
+
+def user_role_exists_bulk(handle, user_roles, **kwargs):
+    """
+    checks the roles of many users at once
+
+    All user roles are fetched with a single class query.
+
+    Args:
+        handle (UcsHandle)
+        user_roles (dict): {user name: roles}, roles is a single role,
+         a comma separated string of multiple roles or a list of roles
+        **kwargs: key-value pair of managed object(MO) property and value,
+                  every role has to match
+
+    Returns:
+        dict: {user name: (True/False, list of AaaUserRole MO/None)}
+
+    Raises:
+        None
+
+    Example:
+        user_role_exists_bulk(handle,
+                              user_roles={"test": "admin,read-only",
+                                          "operator": ["operations"]})
+    """
+    users_roles_mo = {}
+    for mo in handle.query_classid("AaaUserRole"):
+        user_dn = mo.dn[:mo.dn.rfind("/")]
+        users_roles_mo.setdefault(user_dn, {})[mo.name] = mo
+
+    result = {}
+    for user_name, roles in user_roles.items():
+        if isinstance(roles, six.string_types):
+            roles = roles.split(',')
+        roles = [role.strip() for role in roles]
+        user_dn = _base_dn + "/user-" + user_name
+        result[user_name] = _user_roles_match(
+            users_roles_mo.get(user_dn, {}), roles, **kwargs)
+    return result
 
 
 def user_role_modify(handle, user_name, name, **kwargs):
@@ -392,7 +749,7 @@ def user_locale_add(handle, user_name, name, descr=None, **kwargs):
     Example:
         user_locale_add(handle, user_name="test", name="testlocale")
     """
-    from ucsmsdk.mometa.aaa.AaaUserLocale import AaaUserLocale
+    AaaUserLocale = mo_class_get("AaaUserLocale")
 
     user = user_get(handle, user_name, caller="user_locale_add")
 
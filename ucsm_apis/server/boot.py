@@ -13,9 +13,21 @@
 """
 This module performs the operation related to boot.
 """
-from ucsmsdk import ucsgenutils
+import copy
+import functools
+import hashlib
+import json
+import re
+import weakref
+
+from ..utils.cache import InventoryCache
+from ..utils.utils import chunks
+from ..utils.utils import commit
+from ..utils.utils import commit_dry_run
+from ..utils.mometa import mo_class_get
+from ucsmsdk.ucscoremeta import MoPropertyMeta
+from ucsmsdk.ucsexception import UcsException
 from ucsmsdk.ucsexception import UcsOperationError
-from ucsmsdk.ucscoreutils import load_class
 
 import six
 
@@ -23,7 +35,7 @@ import six
 def boot_policy_create(handle, name, org_dn="org-root",
                        reboot_on_update="no", enforce_vnic_name="yes",
                        boot_mode="legacy", policy_owner="local",
-                       descr=None, **kwargs):
+                       descr=None, dry_run=False, **kwargs):
     """
     creates boot policy
 
@@ -36,12 +48,14 @@ def boot_policy_create(handle, name, org_dn="org-root",
         boot_mode (string): "legacy" or "uefi"
         policy_owner (string): "local" or "pending-policy" or  "policy"
         descr (string): Basic description.
+        dry_run (bool): if True, return the request instead of sending it
         **kwargs: Any additional key-value pair of managed object(MO)'s
                   property and value, which are not part of regular args.
                   This should be used for future version compatibility.
 
     Returns:
-        LsbootPolicy: managed object
+        LsbootPolicy: managed object, or the commit_dry_run() dict if
+         dry_run is True
 
     Raises:
         UcsOperationError: if OrgOrg is not present
@@ -55,7 +69,7 @@ def boot_policy_create(handle, name, org_dn="org-root",
                            boot_mode="legacy",
                            descr="sample description")
     """
-    from ucsmsdk.mometa.lsboot.LsbootPolicy import LsbootPolicy
+    LsbootPolicy = mo_class_get("LsbootPolicy")
 
     obj = handle.query_dn(org_dn)
     if not obj:
@@ -71,7 +85,10 @@ def boot_policy_create(handle, name, org_dn="org-root",
 
     mo.set_prop_multiple(**kwargs)
     handle.add_mo(mo, modify_present=True)
+    if dry_run:
+        return commit_dry_run(handle)
     handle.commit()
+    _boot_policy_cache_invalidate(handle, [mo.dn])
     return mo
 
 
@@ -127,8 +144,13 @@ def boot_policy_exists(handle, name, org_dn="org-root", **kwargs):
                           org_dn="org-root/org-finance")
     """
     try:
-        mo = boot_policy_get(handle=handle, name=name, org_dn=org_dn,
-                             caller="boot_policy_exists")
+        if handle in _boot_policy_tree_caches:
+            # shares the hierarchical fetch with the boot order APIs
+            mo = _boot_policy_tree_get(handle, name, org_dn,
+                                       caller="boot_policy_exists")
+        else:
+            mo = boot_policy_get(handle=handle, name=name, org_dn=org_dn,
+                                 caller="boot_policy_exists")
     except UcsOperationError:
         return (False, None)
     mo_exists = mo.check_prop_match(**kwargs)
@@ -164,6 +186,7 @@ def boot_policy_modify(handle, name, org_dn="org-root", **kwargs):
     mo.set_prop_multiple(**kwargs)
     handle.set_mo(mo)
     handle.commit()
+    _boot_policy_cache_invalidate(handle, [mo.dn])
     return mo
 
 
@@ -190,28 +213,36 @@ def boot_policy_delete(handle, name, org_dn="org-root"):
                          caller="boot_policy_delete")
     handle.remove_mo(mo)
     handle.commit()
+    _boot_policy_cache_invalidate(handle, [mo.dn])
 
 
-def _boot_security_configure(handle, name, org_dn, secure_boot, **kwargs):
-    from ucsmsdk.mometa.lsboot.LsbootBootSecurity import LsbootBootSecurity
-
-    boot_policy = boot_policy_get(handle, name, org_dn,
-                                  caller="boot_security_enable")
+def _boot_security_precondition_error(boot_policy):
     if boot_policy.boot_mode != "uefi":
-        raise UcsOperationError("boot_security_enable",
-            "boot mode should be equal to 'uefi' to configure boot security")
-
-    mo = LsbootBootSecurity(parent_mo_or_dn=boot_policy)
+        return "boot mode should be equal to 'uefi' to configure boot security"
+    return None
 
-    args = {
-            'secure_boot': secure_boot
-        }
 
-    mo.set_prop_multiple(**args)
+def _boot_security_stage(handle, boot_policy_dn, secure_boot, **kwargs):
+    LsbootBootSecurity = mo_class_get("LsbootBootSecurity")
 
+    mo = LsbootBootSecurity(parent_mo_or_dn=boot_policy_dn)
+    mo.set_prop_multiple(secure_boot=secure_boot)
     mo.set_prop_multiple(**kwargs)
-    handle.add_mo(boot_policy, modify_present=True)
+    handle.add_mo(mo, modify_present=True)
+    return mo
+
+
+def _boot_security_configure(handle, name, org_dn, secure_boot, **kwargs):
+    boot_policy = boot_policy_get(handle, name, org_dn,
+                                  caller="boot_security_enable")
+    error = _boot_security_precondition_error(boot_policy)
+    if error:
+        raise UcsOperationError("boot_security_enable", error)
+
+    # only the boot-security child is sent, not the whole boot policy
+    mo = _boot_security_stage(handle, boot_policy.dn, secure_boot, **kwargs)
     handle.commit()
+    _boot_policy_cache_invalidate(handle, [boot_policy.dn])
     return mo
 
 
@@ -294,12 +325,10 @@ def boot_security_disable(handle, name, org_dn="org-root"):
 
 
 def _local_lun_add(parent_mo, order, lun_name=None, type=None):
-    from ucsmsdk.mometa.lsboot.LsbootLocalHddImage import LsbootLocalHddImage
-    from ucsmsdk.mometa.lsboot.LsbootLocalLunImagePath import \
-        LsbootLocalLunImagePath
+    LsbootLocalHddImage = mo_class_get("LsbootLocalHddImage")
+    LsbootLocalLunImagePath = mo_class_get("LsbootLocalLunImagePath")
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == "LsbootLocalHddImage"]
+    mo = _children_get(parent_mo, "LsbootLocalHddImage")
     if mo and not mo[0].child:
         raise UcsOperationError(
             "_local_lun_add",
@@ -339,13 +368,10 @@ def _local_lun_add(parent_mo, order, lun_name=None, type=None):
 
 
 def _local_jbod_add(parent_mo, order, slot_number):
-    from ucsmsdk.mometa.lsboot.LsbootLocalDiskImage import \
-        LsbootLocalDiskImage
-    from ucsmsdk.mometa.lsboot.LsbootLocalDiskImagePath import \
-        LsbootLocalDiskImagePath
+    LsbootLocalDiskImage = mo_class_get("LsbootLocalDiskImage")
+    LsbootLocalDiskImagePath = mo_class_get("LsbootLocalDiskImagePath")
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == "LsbootLocalDiskImage"]
+    mo = _children_get(parent_mo, "LsbootLocalDiskImage")
     if mo:
         raise UcsOperationError(
             "_local_jbod_add",
@@ -364,13 +390,11 @@ def _local_jbod_add(parent_mo, order, slot_number):
 
 
 def _local_embedded_disk_add(parent_mo, order, slot_number=None, type=None):
-    from ucsmsdk.mometa.lsboot.LsbootEmbeddedLocalDiskImage import \
-        LsbootEmbeddedLocalDiskImage
-    from ucsmsdk.mometa.lsboot.LsbootEmbeddedLocalDiskImagePath import \
-        LsbootEmbeddedLocalDiskImagePath
+    LsbootEmbeddedLocalDiskImage = mo_class_get("LsbootEmbeddedLocalDiskImage")
+    LsbootEmbeddedLocalDiskImagePath = mo_class_get(
+        "LsbootEmbeddedLocalDiskImagePath")
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == "LsbootEmbeddedLocalDiskImage"]
+    mo = _children_get(parent_mo, "LsbootEmbeddedLocalDiskImage")
     if mo and not mo[0].child:
         raise UcsOperationError("_local_embedded_disk_add",
                                 "Instance of Local Embedded Disk already "
@@ -410,11 +434,10 @@ def _local_embedded_disk_add(parent_mo, order, slot_number=None, type=None):
 
 
 def _lan_device_add(parent_mo, order, vnic_name):
-    from ucsmsdk.mometa.lsboot.LsbootLan import LsbootLan
-    from ucsmsdk.mometa.lsboot.LsbootLanImagePath import LsbootLanImagePath
+    LsbootLan = mo_class_get("LsbootLan")
+    LsbootLanImagePath = mo_class_get("LsbootLanImagePath")
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == "LsbootLan"]
+    mo = _children_get(parent_mo, "LsbootLan")
 
     if mo and mo[0].child:
         child_count = len(mo[0].child)
@@ -443,18 +466,35 @@ def _lan_device_add(parent_mo, order, vnic_name):
         type="primary")
 
 
+# class id -> children index of the MOs of a boot policy tree
+_child_indexes = weakref.WeakKeyDictionary()
+
+
+def _child_index_get(parent_mo):
+    # children are appended while a tree is built, so only the new ones get
+    # indexed; the index is rebuilt once children were removed
+    children = parent_mo.child
+    count, last, index = _child_indexes.get(parent_mo, (0, None, {}))
+    if count > len(children) or (count and children[count - 1] is not last):
+        count, index = 0, {}
+    for mo in children[count:]:
+        index.setdefault(mo.get_class_id(), []).append(mo)
+    _child_indexes[parent_mo] = (len(children),
+                                 children[-1] if children else None, index)
+    return index
+
+
 def _children_get(parent_mo, class_id):
-    return [mo for mo in parent_mo.child if mo.get_class_id() == class_id]
+    return list(_child_index_get(parent_mo).get(class_id, []))
 
 
 def _san_add(parent_mo, order):
-    from ucsmsdk.mometa.lsboot.LsbootSan import LsbootSan
+    LsbootSan = mo_class_get("LsbootSan")
     return LsbootSan(parent_mo_or_dn=parent_mo, order=order)
 
 
 def _san_image_add(parent_mo, type, vnic_name):
-    from ucsmsdk.mometa.lsboot.LsbootSanCatSanImage import \
-        LsbootSanCatSanImage
+    LsbootSanCatSanImage = mo_class_get("LsbootSanCatSanImage")
     if not (vnic_name and type):
         raise UcsOperationError("Required Parameter 'vnic_name' or "
                                 "'type' missing.")
@@ -464,11 +504,11 @@ def _san_image_add(parent_mo, type, vnic_name):
 
 
 def _san_boot_target_add(parent_mo, target_type, wwn, lun):
-    from ucsmsdk.mometa.lsboot.LsbootSanCatSanImagePath import \
-        LsbootSanCatSanImagePath
+    LsbootSanCatSanImagePath = mo_class_get("LsbootSanCatSanImagePath")
     if target_type or wwn or lun:
         if not (wwn and lun and target_type):
-            raise UcsOperationError("Required Parameter 'wwn' or "
+            raise UcsOperationError("_san_boot_target_add",
+                                    "Required Parameter 'wwn' or "
                                     "'lun' or 'target_type' missing.")
         return LsbootSanCatSanImagePath(parent_mo_or_dn=parent_mo,
                                         type=target_type,
@@ -611,11 +651,10 @@ def _san_device_add(parent_mo, order,
 
 
 def _iscsi_device_add(parent_mo, order, vnic_name):
-    from ucsmsdk.mometa.lsboot.LsbootIScsi import LsbootIScsi
-    from ucsmsdk.mometa.lsboot.LsbootIScsiImagePath import LsbootIScsiImagePath
+    LsbootIScsi = mo_class_get("LsbootIScsi")
+    LsbootIScsiImagePath = mo_class_get("LsbootIScsiImagePath")
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == "LsbootIScsi"]
+    mo = _children_get(parent_mo, "LsbootIScsi")
 
     if mo and mo[0].child:
         child_count = len(mo[0].child)
@@ -680,15 +719,14 @@ def _local_device_add(parent_mo, device_name, device_order, **kwargs):
         return
 
     class_id = _local_devices[device_name][0]
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == class_id]
+    mo = _children_get(parent_mo, class_id)
 
     if mo:
         raise UcsOperationError(
             "_local_device_add", "Device '%s' already exist at order '%s'" %
             (device_name, mo[0].order))
 
-    class_struct = load_class(class_id)
+    class_struct = mo_class_get(class_id)
     class_obj = class_struct(parent_mo_or_dn=parent_mo, order=device_order,
                              **kwargs)
 
@@ -697,14 +735,14 @@ def _vmedia_device_add(parent_mo, device_name, device_order, **kwargs):
     class_id = "LsbootVirtualMedia"
     access = _vmedia_devices[device_name]
 
-    mo = [mo for mo in parent_mo.child
-          if mo.get_class_id() == class_id and mo.access == access]
+    mo = [mo for mo in _children_get(parent_mo, class_id)
+          if mo.access == access]
     if mo:
         raise UcsOperationError(
             "_vmedia_device_add", "Device '%s' already exist at order '%s'" %
             (device_name, mo[0].order))
 
-    class_struct = load_class(class_id)
+    class_struct = mo_class_get(class_id)
     class_obj = class_struct(parent_mo_or_dn=parent_mo,
                              access=access,
                              order=device_order, **kwargs)
@@ -713,13 +751,13 @@ def _vmedia_device_add(parent_mo, device_name, device_order, **kwargs):
 def _efi_device_add(parent_mo, device_order, **kwargs):
     class_id = "LsbootEFIShell"
 
-    mo = [mo for mo in parent_mo.child if mo.get_class_id() == class_id]
+    mo = _children_get(parent_mo, class_id)
     if mo:
         raise UcsOperationError(
         "__efi_device_add", "Device '%s' already exist at order '%s'" %
-        (device_name, mo[0].order))
+        ("efi", mo[0].order))
 
-    class_struct = load_class(class_id)
+    class_struct = mo_class_get(class_id)
     class_obj = class_struct(parent_mo_or_dn=parent_mo,
                              order=device_order, **kwargs)
 
@@ -762,63 +800,175 @@ def _validate_device_combination(devices):
                                 "'floppy' or 'floppy_local, floppy_remote'")
 
 
-def _device_add(handle, boot_policy, devices):
-    from ucsmsdk.mometa.lsboot.LsbootStorage import LsbootStorage
-    from ucsmsdk.mometa.lsboot.LsbootLocalStorage import LsbootLocalStorage
+def _device_step_get(device_name, device_order, device_props):
+    # returns (is_local, function adding the device below its parent MO)
+    if device_name in _local_devices:
+        return True, functools.partial(_local_device_add,
+                                       device_name=device_name,
+                                       device_order=device_order,
+                                       **device_props)
+    elif device_name in _vmedia_devices:
+        return False, functools.partial(_vmedia_device_add,
+                                        device_name=device_name,
+                                        device_order=device_order)
+    elif device_name == "lan":
+        return False, functools.partial(_lan_device_add, order=device_order,
+                                        **device_props)
+    elif device_name == "san":
+        return False, functools.partial(_san_device_add, order=device_order,
+                                        **device_props)
+    elif device_name == "iscsi":
+        return False, functools.partial(_iscsi_device_add,
+                                        order=device_order, **device_props)
+    elif device_name == "efi":
+        return False, functools.partial(_efi_device_add,
+                                        device_order=device_order,
+                                        **device_props)
+    raise UcsOperationError(
+        "_device_add",
+        " Invalid Device <%s>" %
+        device_name)
+
+
+class BootPlan(object):
+    """
+    Validated and normalized boot devices spec, see compile_boot_plan().
 
-    _validate_device_combination(devices)
+    A BootPlan is immutable and hashable, two plans compiled from the same
+    devices are equal. It can be passed wherever a devices list is
+    accepted.
+    """
+
+    __slots__ = ("_entries", "_steps", "_hash")
+
+    def __init__(self, entries):
+        object.__setattr__(self, "_entries", entries)
+        object.__setattr__(self, "_steps", tuple(
+            _device_step_get(device_name, device_order, dict(device_props))
+            for device_name, device_order, device_props in entries))
+        object.__setattr__(self, "_hash", hash(entries))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BootPlan is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, BootPlan) and \
+            self._entries == other._entries
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        # yields the devices in the devices list format
+        for device_name, device_order, device_props in self._entries:
+            device = {"device_name": device_name,
+                      "device_order": device_order}
+            device.update(device_props)
+            yield device
 
-    ls_boot_storage_exist = False
+    def __repr__(self):
+        return "BootPlan(%r)" % list(self)
+
+
+def _boot_plan_value_get(value, normalize):
+    return value if value is None or not normalize else str(value)
+
+
+def _boot_plan_entries_get(devices, normalize=True):
+    # with normalize, values are turned into strings as UCSM returns them
+    entries = []
     for device in devices:
-        device_name = device["device_name"]
-        device_order = str(device["device_order"])
-        device_props = {key: value for key, value in six.iteritems(device)
-                        if key not in ["device_name", "device_order"]}
-        if device_name in _local_devices:
-            if not ls_boot_storage_exist:
-                lsboot_storage = LsbootStorage(parent_mo_or_dn=boot_policy)
-                lsboot_local_storage = LsbootLocalStorage(
-                    parent_mo_or_dn=lsboot_storage)
-                ls_boot_storage_exist = True
-            _local_device_add(lsboot_local_storage, device_name,
-                              device_order, **device_props)
-        elif device_name in _vmedia_devices:
-            _vmedia_device_add(boot_policy, device_name, device_order)
-        elif device_name == "lan":
-            _lan_device_add(boot_policy, device_order, **device_props)
-        elif device_name == "san":
-            _san_device_add(boot_policy, device_order, **device_props)
-        elif device_name == "iscsi":
-            _iscsi_device_add(boot_policy, device_order, **device_props)
-        elif device_name == "efi":
-            _efi_device_add(boot_policy, device_order, **device_props)
-        else:
-            raise UcsOpeartionError(
-                "_device_add",
-                " Invalid Device <%s>" %
-                device_name)
+        device_props = tuple(sorted(
+            (key, _boot_plan_value_get(value, normalize))
+            for key, value in six.iteritems(device)
+            if key not in ["device_name", "device_order"]))
+        entries.append((device["device_name"],
+                        _boot_plan_value_get(device["device_order"],
+                                             normalize),
+                        device_props))
+    return tuple(entries)
 
 
-def _boot_policy_order_clear(handle, boot_policy):
+# compiled plans by the devices as given, evaluating the same spec again is
+# a lookup. The key keeps the raw values, lun=0 and lun="0" do not validate
+# the same way.
+_boot_plan_cache = {}
+_boot_plan_cache_size = 1024
 
-    mo_list = handle.query_children(in_mo=boot_policy)
-    if mo_list is None:
-        return
-    for mo in mo_list:
-        if mo.get_class_id() == "LsbootBootSecurity":
+
+def compile_boot_plan(devices):
+    """
+    validates and normalizes a boot devices spec into a BootPlan
+
+    Plans are cached by content, so compiling the same devices again
+    returns the same plan without validating it again.
+
+    Args:
+        devices (list of dict or BootPlan): see boot_policy_order_set
+
+    Returns:
+        BootPlan
+
+    Raises:
+        UcsOperationError: if devices are invalid
+
+    Example:
+        plan = compile_boot_plan(devices)
+        boot_policy_order_set(handle, name="sample_boot", devices=plan)
+        boot_policy_order_exists(handle, name="sample_boot", devices=plan)
+    """
+    if isinstance(devices, BootPlan):
+        return devices
+
+    raw_entries = _boot_plan_entries_get(devices, normalize=False)
+    plan = _boot_plan_cache.get(raw_entries)
+    if plan is not None:
+        return plan
+
+    LsbootPolicy = mo_class_get("LsbootPolicy")
+
+    # validation sees the values as given, only then they are normalized
+    _validate_device_combination(devices)
+    # a trial build offline catches the per device errors
+    _boot_plan_build(LsbootPolicy(parent_mo_or_dn="org-root", name="plan"),
+                     BootPlan(raw_entries))
+    plan = BootPlan(_boot_plan_entries_get(devices))
+
+    if len(_boot_plan_cache) >= _boot_plan_cache_size:
+        _boot_plan_cache.clear()
+    _boot_plan_cache[raw_entries] = plan
+    return plan
+
+
+def _boot_plan_build(boot_policy, plan):
+    LsbootStorage = mo_class_get("LsbootStorage")
+    LsbootLocalStorage = mo_class_get("LsbootLocalStorage")
+
+    lsboot_local_storage = None
+    for is_local, device_add in plan._steps:
+        if not is_local:
+            device_add(boot_policy)
             continue
-        handle.remove_mo(mo)
+        if lsboot_local_storage is None:
+            lsboot_storage = LsbootStorage(parent_mo_or_dn=boot_policy)
+            lsboot_local_storage = LsbootLocalStorage(
+                parent_mo_or_dn=lsboot_storage)
+        device_add(lsboot_local_storage)
 
-    if boot_policy.reboot_on_update in ucsgenutils.AFFIRMATIVE_LIST:
-        boot_policy.reboot_on_update = "no"
-        handle.set_mo(boot_policy)
-        handle.commit()
-        boot_policy.reboot_on_update = "yes"
-        handle.set_mo(boot_policy)
-    handle.commit()
+
+def _device_add(handle, boot_policy, devices):
+    _boot_plan_build(boot_policy, compile_boot_plan(devices))
 
 
-def _extract_device_from_bp_child(bp_child):
+def _extract_device_from_bp_child(bp_child, unknown=None):
+    # with an unknown list, devices without a device_name are appended to
+    # it instead of raising
     bp_devices = {}
 
     for ch_ in bp_child:
@@ -831,20 +981,38 @@ def _extract_device_from_bp_child(bp_child):
             bp_devices["lan"] = ch_
         elif class_id == "LsbootVirtualMedia":
             access = ch_.access
+            if access not in _vmedia_device_invert:
+                if unknown is not None:
+                    unknown.append(ch_)
+                    continue
+                raise UcsOperationError(
+                    "_compare_boot_policy",
+                    "Unknown virtual media access '%s'." % access)
             device = _vmedia_device_invert[access]
             bp_devices[device] = ch_
         elif class_id == "LsbootStorage":
+            if not ch_.child:
+                continue
             local_storage = ch_.child[0]
             for local_ch_ in local_storage.child:
                 local_class_id = local_ch_.get_class_id()
+                if local_class_id not in _local_device_invert:
+                    if unknown is not None:
+                        unknown.append(local_ch_)
+                        continue
+                    raise UcsOperationError(
+                        "_compare_boot_policy",
+                        "Unknown local device '%s'." % local_class_id)
                 device = _local_device_invert[local_class_id]
                 bp_devices[device] = local_ch_
         elif class_id == "LsbootIScsi":
             bp_devices["iscsi"] = ch_
         elif class_id == "LsbootEFIShell":
             bp_devices["efi"] = ch_
+        elif unknown is not None:
+            unknown.append(ch_)
         else:
-            raise UcsOpeationError("_compare_boot_policy", "Unknown Device.")
+            raise UcsOperationError("_compare_boot_policy", "Unknown Device.")
 
     return bp_devices
 
@@ -1106,78 +1274,301 @@ def _compare_efi(existing_efi, expected_efi):
     _device_compare(existing_efi, 'efi', order=expected_efi.order)
 
 
-def _compare_boot_policy(existing_boot_policy, expected_boot_policy, debug=False):
-    # check child count
-    existing_bp_child = existing_boot_policy.child
-    expected_bp_child = expected_boot_policy.child
-
-    existing_bp_child = [ch for ch in existing_bp_child
-                         if ch.get_class_id() != "LsbootBootSecurity"]
-
-    if debug:
-        print("existing_bp_child:\n%s" % existing_bp_child)
-        print("expected_bp_child:\n%s" % expected_bp_child)
-    if len(existing_bp_child) != len(expected_bp_child):
-        raise UcsOperationError("_compare_boot_policy",
-                                "Child count mismatch.")
-
-    existing_bp_devices = _extract_device_from_bp_child(existing_bp_child)
-    expected_bp_devices = _extract_device_from_bp_child(expected_bp_child)
-
-    for device_name in existing_bp_devices:
-        if device_name not in expected_bp_devices:
-            raise UcsOperationError("_compare_boot_policy",
-                                    "Device does not already exist.")
-
-        existing_bp_device = existing_bp_devices[device_name]
-        expected_bp_device = expected_bp_devices[device_name]
-
-        if device_name in _vmedia_devices:
+def _compare_device(device_name, existing_bp_device, expected_bp_device):
+    if device_name in _vmedia_devices:
+        if not existing_bp_device.check_prop_match(
+                order=expected_bp_device.order):
+            raise UcsOperationError(
+                "_compare_boot_policy",
+                "Order mismatch for device '%s'." %
+                device_name)
+    elif device_name in _local_devices:
+        if _local_devices[device_name][1] is None:
             if not existing_bp_device.check_prop_match(
                     order=expected_bp_device.order):
                 raise UcsOperationError(
                     "_compare_boot_policy",
                     "Order mismatch for device '%s'." %
                     device_name)
-        elif device_name in _local_devices:
-            if _local_devices[device_name][1] is None:
-                if not existing_bp_device.check_prop_match(
-                        order=expected_bp_device.order):
-                    raise UcsOperationError(
-                        "_compare_boot_policy",
-                        "Order mismatch for device '%s'." %
-                        device_name)
-            elif device_name == "local_lun":
-                _compare_local_lun(existing_bp_device,
+        elif device_name == "local_lun":
+            _compare_local_lun(existing_bp_device,
+                               expected_bp_device)
+        elif device_name == "local_jbod":
+            _compare_local_jbod(existing_bp_device,
+                                expected_bp_device)
+        elif device_name == "embedded_disk":
+            _compare_embedded_disk(existing_bp_device,
                                    expected_bp_device)
-            elif device_name == "local_jbod":
-                _compare_local_jbod(existing_bp_device,
-                                    expected_bp_device)
-            elif device_name == "embedded_disk":
-                _compare_embedded_disk(existing_bp_device,
-                                       expected_bp_device)
-        elif device_name == "lan":
-            _compare_lan(existing_bp_device,
-                         expected_bp_device)
-        elif device_name == "san":
-            _compare_san(existing_bp_device,
-                         expected_bp_device)
-        elif device_name == "iscsi":
-            _compare_iscsi(existing_bp_device,
-                           expected_bp_device)
-        elif device_name == "efi":
-            _compare_efi(existing_bp_device,
-                         expected_bp_device)
-
-
-def boot_policy_order_set(handle, name, devices, org_dn="org-root"):
+    elif device_name == "lan":
+        _compare_lan(existing_bp_device,
+                     expected_bp_device)
+    elif device_name == "san":
+        _compare_san(existing_bp_device,
+                     expected_bp_device)
+    elif device_name == "iscsi":
+        _compare_iscsi(existing_bp_device,
+                       expected_bp_device)
+    elif device_name == "efi":
+        _compare_efi(existing_bp_device,
+                     expected_bp_device)
+
+
+_boot_policy_dn_re = re.compile(r"^(.*?/boot-policy-[^/]+)")
+
+
+class BootPolicyTreeCache(InventoryCache):
+    """
+    Per-handle cache of boot policy trees, see boot_policy_cache_enable().
+
+    Trees are kept by boot policy dn. Commits through the boot APIs drop
+    the trees they change; once watch() is called, change events below a
+    boot policy drop its tree as well. With a ttl, all trees are dropped
+    ttl seconds after the cache was (re)filled.
+
+    Trees are copied on the way in and out, so callers may change the trees
+    they get without affecting later readers.
+    """
+
+    def _load(self):
+        return {}
+
+    def tree_get(self, dn):
+        """
+        returns a copy of the cached tree of a boot policy dn or None
+        """
+        boot_policy = self.get().get(dn)
+        return copy.deepcopy(boot_policy) if boot_policy is not None else None
+
+    def tree_put(self, dn, boot_policy):
+        """
+        caches a copy of the tree of a boot policy dn
+        """
+        self.get()[dn] = copy.deepcopy(boot_policy)
+
+    def tree_invalidate(self, dn):
+        """
+        drops the cached tree of a boot policy dn
+        """
+        with self._lock:
+            if self._data is not None:
+                self._data.pop(dn, None)
+
+    def _event_cb(self, mce):
+        match = _boot_policy_dn_re.match(mce.mo.dn)
+        if match:
+            self.tree_invalidate(match.group(1))
+
+
+# handle -> BootPolicyTreeCache, for the handles which opted in
+_boot_policy_tree_caches = weakref.WeakKeyDictionary()
+
+
+def boot_policy_cache_enable(handle, ttl=None, watch=False):
+    """
+    caches the boot policy trees fetched through this handle
+
+    Once enabled, boot_policy_exists, boot_policy_order_exists,
+    boot_policy_order_diff, boot_policy_order_set and the bulk boot order
+    APIs share the fetched trees, so back-to-back checks and sets on the
+    same policy need one fetch.
+
+    Args:
+        handle (UcsHandle)
+        ttl (int): seconds after which all cached trees are dropped, None
+         to keep them until invalidated
+        watch (bool): if True, also drop trees on UCSM change events
+
+    Returns:
+        BootPolicyTreeCache
+
+    Example:
+        boot_policy_cache_enable(handle, watch=True)
+        boot_policy_order_exists(handle, name="sample_boot", devices=devices)
+        boot_policy_order_set(handle, name="sample_boot", devices=devices)
+    """
+    cache = _boot_policy_tree_caches.get(handle)
+    if cache is None:
+        cache = BootPolicyTreeCache(handle, ttl=ttl)
+        _boot_policy_tree_caches[handle] = cache
+    if watch:
+        cache.watch()
+    return cache
+
+
+def boot_policy_cache_disable(handle):
+    """
+    stops caching boot policy trees for this handle
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        None
+
+    Example:
+        boot_policy_cache_disable(handle)
+    """
+    cache = _boot_policy_tree_caches.pop(handle, None)
+    if cache is not None:
+        cache.unwatch()
+
+
+def _boot_policy_cache_invalidate(handle, dns):
+    cache = _boot_policy_tree_caches.get(handle)
+    if cache is None:
+        return
+    for dn in dns:
+        cache.tree_invalidate(dn)
+
+
+def _boot_policy_tree_get(handle, name, org_dn="org-root",
+                          caller="_boot_policy_tree_get"):
+    # fetches the boot policy with all its children in one round trip
+    dn = org_dn + "/boot-policy-" + name
+    cache = _boot_policy_tree_caches.get(handle)
+    if cache is not None:
+        boot_policy = cache.tree_get(dn)
+        if boot_policy is not None:
+            return boot_policy
+
+    response = handle.query_dn(dn, hierarchy=True, need_response=True)
+    if not response.out_configs.child:
+        raise UcsOperationError(caller, "BootPolicy '%s' does not exist" % dn)
+    boot_policy = response.out_configs.child[0]
+    if cache is not None:
+        cache.tree_put(dn, boot_policy)
+    return boot_policy
+
+
+def _boot_policy_expected_get(name, org_dn, devices):
+    # builds the boot policy tree described by devices, offline
+    LsbootPolicy = mo_class_get("LsbootPolicy")
+
+    boot_policy = LsbootPolicy(parent_mo_or_dn=org_dn, name=name)
+    _device_add(None, boot_policy, devices)
+    return boot_policy
+
+
+def _boot_policy_device_diff(existing_boot_policy, expected_boot_policy):
+    """
+    compares the devices of two boot policy trees
+
+    Returns:
+        dict: {"missing": {device_name: expected device MO},
+               "extra": {device_name: existing device MO},
+               "mismatched": {device_name: (existing device MO,
+                                            expected device MO,
+                                            reason)}}
+        existing devices the boot APIs do not know are extra, keyed by rn
+    """
+    unknown = []
+    existing_bp_devices = _extract_device_from_bp_child(
+        existing_boot_policy.child, unknown)
+    expected_bp_devices = _extract_device_from_bp_child(
+        expected_boot_policy.child)
+
+    diff = {"missing": {}, "extra": {}, "mismatched": {}}
+    for device_name, expected_bp_device in expected_bp_devices.items():
+        if device_name not in existing_bp_devices:
+            diff["missing"][device_name] = expected_bp_device
+            continue
+
+        existing_bp_device = existing_bp_devices[device_name]
+        try:
+            _compare_device(device_name, existing_bp_device,
+                            expected_bp_device)
+        except UcsOperationError as err:
+            diff["mismatched"][device_name] = (existing_bp_device,
+                                               expected_bp_device,
+                                               str(err))
+
+    for device_name, existing_bp_device in existing_bp_devices.items():
+        if device_name not in expected_bp_devices:
+            diff["extra"][device_name] = existing_bp_device
+    for existing_bp_device in unknown:
+        diff["extra"][existing_bp_device.rn] = existing_bp_device
+    return diff
+
+
+def _local_storage_get(boot_policy):
+    storages = _children_get(boot_policy, "LsbootStorage")
+    if not storages or not storages[0].child:
+        return None
+    return storages[0].child[0]
+
+
+def _stale_children_remove(handle, existing_mo, expected_mo):
+    # removes the children of existing_mo which are not part of expected_mo
+    expected_children = dict((mo.dn, mo) for mo in expected_mo.child)
+    removed = 0
+    for child in list(existing_mo.child):
+        if child.dn in expected_children:
+            removed += _stale_children_remove(handle, child,
+                                              expected_children[child.dn])
+        else:
+            handle.remove_mo(child)
+            removed += 1
+    return removed
+
+
+def _boot_policy_diff_stage(handle, existing_boot_policy,
+                            expected_boot_policy, diff):
+    """
+    adds the changes which turn existing_boot_policy into
+    expected_boot_policy to the commit buffer
+
+    Returns:
+        int: number of MOs staged, 0 if the boot order is already in place
+    """
+    staged = 0
+    existing_storage = _children_get(existing_boot_policy, "LsbootStorage")
+    expected_storage = _children_get(expected_boot_policy, "LsbootStorage")
+
+    # local devices hang below storage/local-storage, add or remove the
+    # whole container when only one side has local devices
+    local_storage_added = False
+    if _local_storage_get(expected_boot_policy) is not None and \
+            _local_storage_get(existing_boot_policy) is None:
+        handle.add_mo(expected_storage[0], modify_present=True)
+        local_storage_added = True
+        staged += 1
+    local_storage_removed = False
+    if existing_storage and not expected_storage:
+        handle.remove_mo(existing_storage[0])
+        local_storage_removed = True
+        staged += 1
+
+    for device_name, expected_bp_device in diff["missing"].items():
+        if local_storage_added and device_name in _local_devices:
+            continue
+        handle.add_mo(expected_bp_device, modify_present=True)
+        staged += 1
+
+    for device_name, (existing_bp_device, expected_bp_device, reason) in \
+            diff["mismatched"].items():
+        handle.add_mo(expected_bp_device, modify_present=True)
+        staged += 1
+        staged += _stale_children_remove(handle, existing_bp_device,
+                                         expected_bp_device)
+
+    for device_name, existing_bp_device in diff["extra"].items():
+        if local_storage_removed and existing_bp_device.dn.startswith(
+                existing_storage[0].dn + "/"):
+            continue
+        handle.remove_mo(existing_bp_device)
+        staged += 1
+    return staged
+
+
+def boot_policy_order_set(handle, name, devices, org_dn="org-root",
+                          dry_run=False):
     """
     sets boot order for a given boot policy
 
     Args:
         handle (UcsHandle)
         name (string): boot policy name
-        devices (list of dict):
+        devices (list of dict or BootPlan):
          [
             {
              "device_name": device_name,
@@ -1208,9 +1599,11 @@ def boot_policy_order_set(handle, name, devices, org_dn="org-root"):
          *note - mandatory keys are 'device_name' and 'device_order'
                  other key depends on the device.
         org_dn (string): org dn
+        dry_run (bool): if True, return the request instead of sending it,
+         the boot policy is still read from UCSM
 
     Returns:
-        None
+        None, or the commit_dry_run() dict if dry_run is True
 
     Raises:
         UcsOperationError: if LsbootPolicy is not present
@@ -1332,16 +1725,84 @@ def boot_policy_order_set(handle, name, devices, org_dn="org-root"):
     if not devices:
         raise UcsOperationError("boot_policy_order_set", "No device present.")
 
-    boot_policy = boot_policy_get(handle=handle, name=name, org_dn=org_dn,
-                                  caller="boot_policy_order_set")
+    # validate devices and build the desired tree before talking to UCSM
+    expected_boot_policy = _boot_policy_expected_get(name, org_dn, devices)
 
-    # Removes all the devices from the boot order
-    _boot_policy_order_clear(handle, boot_policy)
+    existing_boot_policy = _boot_policy_tree_get(
+        handle, name, org_dn, caller="boot_policy_order_set")
+
+    # apply only the difference in a single commit, so the boot order is
+    # never left empty and reboot_on_update policies are touched once
+    diff = _boot_policy_device_diff(existing_boot_policy,
+                                    expected_boot_policy)
+    staged = _boot_policy_diff_stage(handle, existing_boot_policy,
+                                     expected_boot_policy, diff)
+    if staged:
+        _boot_policy_cache_invalidate(handle, [existing_boot_policy.dn])
+    if staged or dry_run:
+        return commit(handle, dry_run)
 
-    # Add devices and configure boot order
-    _device_add(handle, boot_policy, devices)
-    handle.set_mo(boot_policy)
-    handle.commit()
+
+def _boot_policy_order_diff(handle, name, devices, org_dn, caller):
+    if not devices:
+        raise UcsOperationError(caller, "No device present.")
+
+    expected_boot_policy = _boot_policy_expected_get(name, org_dn, devices)
+    existing_boot_policy = _boot_policy_tree_get(handle, name, org_dn,
+                                                 caller=caller)
+    device_diff = _boot_policy_device_diff(existing_boot_policy,
+                                           expected_boot_policy)
+
+    diff = {"missing": [], "extra": [], "mismatched": []}
+    for device_name, mo in sorted(device_diff["missing"].items()):
+        diff["missing"].append({"device_name": device_name,
+                                "device_order": mo.order})
+    for device_name, mo in sorted(device_diff["extra"].items()):
+        diff["extra"].append({"device_name": device_name,
+                              "device_order": mo.order})
+    for device_name, (existing_mo, expected_mo, reason) in \
+            sorted(device_diff["mismatched"].items()):
+        diff["mismatched"].append({"device_name": device_name,
+                                   "existing_order": existing_mo.order,
+                                   "expected_order": expected_mo.order,
+                                   "reason": reason})
+    return diff, existing_boot_policy
+
+
+def boot_policy_order_diff(handle, name, devices, org_dn="org-root"):
+    """
+    compares the boot order of a boot policy against the given devices
+
+    The expected tree is built offline and compared against a single
+    hierarchical fetch of the boot policy; nothing is modified.
+
+    Args:
+        handle (UcsHandle)
+        name (string): boot policy name
+        devices (list of dict or BootPlan): see
+         boot_policy_order_set
+        org_dn (string): org dn
+
+    Returns:
+        dict: {"missing": [{"device_name": .., "device_order": ..}, ..],
+               "extra": [{"device_name": .., "device_order": ..}, ..],
+               "mismatched": [{"device_name": ..,
+                               "existing_order": ..,
+                               "expected_order": ..,
+                               "reason": ..}, ..]}
+         all lists are empty when the boot order matches
+
+    Raises:
+        UcsOperationError: if LsbootPolicy is not present or devices are
+                           invalid
+
+    Example:
+        diff = boot_policy_order_diff(handle, name="sample_boot",
+                                      devices=devices)
+    """
+    diff, existing_boot_policy = _boot_policy_order_diff(
+        handle, name, devices, org_dn, caller="boot_policy_order_diff")
+    return diff
 
 
 def boot_policy_order_exists(handle, name, devices, org_dn="org-root",
@@ -1353,7 +1814,7 @@ def boot_policy_order_exists(handle, name, devices, org_dn="org-root",
         handle (UcsHandle)
         name (string): boot policy name
         org_dn (string): org dn
-        devices (list of dict):
+        devices (list of dict or BootPlan):
          [
             {
              "device_name": device_name,
@@ -1383,52 +1844,706 @@ def boot_policy_order_exists(handle, name, devices, org_dn="org-root",
 
          *note - mandatory keys are 'device_name' and 'device_order'
                  other key depends on the device.
-        debug (bool): True/False, if True, incase of error print(stacktrace)
+        debug (bool): True/False, if True, print the reason of a mismatch,
+         see boot_policy_order_diff for the structured difference
 
     Returns:
         (True/False, LsbootPolicy MO/None)
 
     Raises:
-        UcsOperationError:
+        None
 
     Example:
         boot_policy_order_exists(handle, name="sample_boot", devices=devices)
     """
-    # create the boot_policy_order_tree
     try:
-        # check if devices is not empty
-        if not devices:
-            raise UcsOperationError(
-                "boot_policy_order_exists",
-                "No device present.")
-
-        boot_policy = boot_policy_get(handle=handle, name=name, org_dn=org_dn,
-                                      caller="boot_policy_order_exists")
-
-        # Add devices and configure boot order
-        _device_add(handle, boot_policy, devices)
+        diff, existing_boot_policy = _boot_policy_order_diff(
+            handle, name, devices, org_dn, caller="boot_policy_order_exists")
     except Exception as err:
+        # like the original implementation, any failure means the boot
+        # order does not exist
+        if debug:
+            print(str(err))
         return False, None
 
-    expected_boot_policy = boot_policy
-
-    try:
-        response = handle.query_dn(dn=boot_policy.dn,
-                                   hierarchy=True,
-                                   need_response=True)
-        existing_boot_policy = response.out_configs.child[0]
-    except Exception as err:
+    if any(diff.values()):
         if debug:
-            import traceback
-            print(traceback.format_exc())
+            print("boot order diff:\n%s" % diff)
         return False, None
 
+    return True, existing_boot_policy
+
+
+# device properties which take part in the comparison of boot orders, per
+# class, the same ones the _compare_* helpers look at. Devices themselves
+# are only compared by order.
+_fingerprint_props = {
+    "LsbootLocalLunImagePath": ("type", "lun_name"),
+    "LsbootLocalDiskImagePath": ("type", "slot_number"),
+    "LsbootEmbeddedLocalDiskImagePath": ("type", "slot_number"),
+    "LsbootLanImagePath": ("type", "vnic_name"),
+    "LsbootSanCatSanImage": ("type", "vnic_name"),
+    "LsbootSanImage": ("type", "vnic_name"),
+    "LsbootSanCatSanImagePath": ("type", "wwn", "lun"),
+    "LsbootSanImagePath": ("type", "wwn", "lun"),
+    "LsbootIScsiImagePath": ("type", "i_scsi_vnic_name"),
+}
+_fingerprint_device_props = ("order",)
+
+
+def _mo_canonical_get(mo):
+    # order insensitive text form of a device subtree, read-only values
+    # UCSM fills in are left out so that offline built trees match
+    class_id = mo.get_class_id()
+    props = ["%s=%s" % (prop, getattr(mo, prop))
+             for prop in _fingerprint_props.get(class_id,
+                                                _fingerprint_device_props)
+             if prop in mo.prop_meta and
+             mo.prop_meta[prop].access != MoPropertyMeta.READ_ONLY and
+             getattr(mo, prop, None) is not None]
+    children = sorted(_mo_canonical_get(child) for child in mo.child)
+    return "%s(%s)[%s]" % (class_id, ",".join(props), ",".join(children))
+
+
+def boot_policy_fingerprint(boot_policy):
+    """
+    computes a canonical fingerprint of the boot order of a boot policy tree
+
+    Two boot policies have the same fingerprint when they boot from the same
+    devices in the same order, regardless of the order in which UCSM returns
+    their children.
+
+    Args:
+        boot_policy (LsbootPolicy): boot policy MO with its children
+
+    Returns:
+        string: hex digest
+
+    Raises:
+        UcsOperationError: if the boot policy contains an unknown device
+
+    Example:
+        fingerprint = boot_policy_fingerprint(boot_policy_mo)
+    """
+    bp_devices = _extract_device_from_bp_child(boot_policy.child)
+    canonical = "|".join(
+        sorted("%s:%s" % (device_name, _mo_canonical_get(mo))
+               for device_name, mo in bp_devices.items()))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def _boot_policy_trees_get(handle, dns=None, use_cache=True):
+    # fetches every boot policy, or only the given dns, with all their
+    # children in one round trip. Streaming callers pass use_cache=False
+    # so that the tree cache does not grow with every batch.
+    cache = _boot_policy_tree_caches.get(handle) if use_cache else None
+    boot_policies = []
+    filter_str = None
+    if dns:
+        if cache is not None:
+            cached = [cache.tree_get(dn) for dn in dns]
+            boot_policies = [mo for mo in cached if mo is not None]
+            dns = [dn for dn, mo in zip(dns, cached) if mo is None]
+            if not dns:
+                return boot_policies
+        filter_str = " or ".join('(dn, "%s", type="eq")' % dn for dn in dns)
+
+    response = handle.query_classid("LsbootPolicy", filter_str=filter_str,
+                                    hierarchy=True, need_response=True)
+    fetched = [mo for mo in response.out_configs.child
+               if mo.get_class_id() == "LsbootPolicy"]
+    if dns and cache is not None:
+        for mo in fetched:
+            cache.tree_put(mo.dn, mo)
+    return boot_policies + fetched
+
+
+def boot_policy_compliance_scan(handle, golden_specs, org_dn=None):
+    """
+    checks all boot policies against a set of golden boot orders
+
+    Every boot policy subtree is fetched with a single hierarchical class
+    query and grouped by its boot_policy_fingerprint().
+
+    Args:
+        handle (UcsHandle)
+        golden_specs (dict): {label: devices}, devices as in
+         boot_policy_order_set
+        org_dn (string): scan only the boot policies below this org,
+         all orgs if None
+
+    Returns:
+        dict: {"golden": {label: {"fingerprint": fingerprint,
+                                  "compliant": [boot policy dn, ..]}},
+               "groups": {fingerprint: [boot policy dn, ..]},
+               "unmatched": [dns matching none of the golden specs],
+               "failed": {boot policy dn: error message}}
+        Every scanned boot policy is reported once, either as compliant
+        with the golden spec it matches or as unmatched.
+
+    Raises:
+        UcsOperationError: if a golden spec is invalid
+
+    Example:
+        report = boot_policy_compliance_scan(
+                    handle,
+                    golden_specs={"pxe_first": pxe_devices,
+                                  "disk_first": disk_devices})
+    """
+    golden_fingerprints = {}
+    for label, devices in golden_specs.items():
+        if not devices:
+            raise UcsOperationError("boot_policy_compliance_scan",
+                                    "No device present in '%s'." % label)
+        expected_boot_policy = _boot_policy_expected_get(label, "org-root",
+                                                         devices)
+        golden_fingerprints[label] = boot_policy_fingerprint(
+            expected_boot_policy)
+
+    groups = {}
+    failed = {}
+    for boot_policy in _boot_policy_trees_get(handle):
+        if org_dn and not boot_policy.dn.startswith(org_dn + "/"):
+            continue
+        try:
+            fingerprint = boot_policy_fingerprint(boot_policy)
+        except UcsOperationError as err:
+            failed[boot_policy.dn] = str(err)
+            continue
+        groups.setdefault(fingerprint, []).append(boot_policy.dn)
+
+    for dns in groups.values():
+        dns.sort()
+
+    golden = {}
+    for label, fingerprint in golden_fingerprints.items():
+        golden[label] = {
+            "fingerprint": fingerprint,
+            "compliant": list(groups.get(fingerprint, [])),
+        }
+
+    matched = set(golden_fingerprints.values())
+    unmatched = sorted(dn for fingerprint, dns in groups.items()
+                       if fingerprint not in matched for dn in dns)
+
+    return {"golden": golden, "groups": groups, "unmatched": unmatched,
+            "failed": failed}
+
+
+def _boot_policy_ref_dn_get(policy_ref, caller="boot_policy_order_set_bulk"):
+    if isinstance(policy_ref, dict):
+        if "name" not in policy_ref:
+            raise UcsOperationError(caller, "Required key 'name' missing")
+        org_dn = policy_ref.get("org_dn", "org-root")
+        return org_dn + "/boot-policy-" + policy_ref["name"]
+    return policy_ref
+
+
+def _boot_policy_dn_split(dn):
+    # returns (name, org_dn) of a boot policy dn
+    org_dn, rn = dn.rsplit("/", 1)
+    return rn[len("boot-policy-"):], org_dn
+
+
+def _boot_policy_staged_discard(handle, dn):
+    # drops whatever was staged below one boot policy from the commit
+    # buffer, ucsmsdk only offers discarding the whole buffer
+    commit_buf = handle._get_commit_buf(handle._auto_set_tag_context(None))
+    for mo_dn in [mo_dn for mo_dn in commit_buf
+                  if mo_dn == dn or mo_dn.startswith(dn + "/")]:
+        del commit_buf[mo_dn]
+
+
+def _boot_policy_stage_commit(handle, staged_dns, result, dry_run=False):
+    # staging may have detached children from the fetched trees
+    _boot_policy_cache_invalidate(handle, staged_dns)
+    if dry_run:
+        result.setdefault("dry_run", []).append(commit_dry_run(handle))
+        result["changed"].extend(staged_dns)
+        return
     try:
-        _compare_boot_policy(existing_boot_policy, expected_boot_policy, debug)
-    except Exception as err:
-        if debug:
-            import traceback
-            print(traceback.format_exc())
-        return False, None
+        handle.commit()
+    except UcsException as err:
+        handle.commit_buffer_discard()
+        for dn in staged_dns:
+            result["failed"][dn] = str(err)
+        return
+    result["changed"].extend(staged_dns)
+
+
+def boot_policy_order_set_bulk(handle, policy_refs, devices,
+                               batch_size=100, dry_run=False):
+    """
+    sets the same boot order for many boot policies
+
+    The devices are validated once, all boot policies are fetched with a
+    single query and only the policies which differ are changed, with one
+    commit per batch.
+
+    Args:
+        handle (UcsHandle)
+        policy_refs (list): boot policies to act upon, each entry is either
+         a dict with keys name and optionally org_dn, or a boot policy dn
+        devices (list of dict or BootPlan): see
+         boot_policy_order_set
+        batch_size (int): maximum number of boot policies per commit
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"changed": [boot policy dn, ...],
+               "skipped": [boot policy dn already in this boot order, ...],
+               "failed": {boot policy dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if devices are invalid or a policy_refs entry is
+                           missing mandatory keys
+
+    Example:
+        boot_policy_order_set_bulk(
+            handle,
+            policy_refs=[{"name": "sample_boot"},
+                         "org-root/org-finance/boot-policy-fin_boot"],
+            devices=[{"device_name": "lan", "device_order": "1",
+                      "vnic_name": "vnic0"},
+                     {"device_name": "local_disk", "device_order": "2"}])
+    """
+    if not devices:
+        raise UcsOperationError("boot_policy_order_set_bulk",
+                                "No device present.")
+    # validate devices once before talking to UCSM
+    devices = compile_boot_plan(devices)
+
+    dns = []
+    for policy_ref in policy_refs:
+        dn = _boot_policy_ref_dn_get(policy_ref)
+        if dn not in dns:
+            dns.append(dn)
+
+    result = {"changed": [], "skipped": [], "failed": {}}
+    if not dns:
+        return result
+
+    existing_boot_policies = dict(
+        (mo.dn, mo) for mo in _boot_policy_trees_get(handle, dns))
+
+    staged_dns = []
+    for dn in dns:
+        existing_boot_policy = existing_boot_policies.get(dn)
+        if existing_boot_policy is None:
+            result["failed"][dn] = str(UcsOperationError(
+                "boot_policy_order_set_bulk",
+                "BootPolicy '%s' does not exist" % dn))
+            continue
+
+        name, org_dn = _boot_policy_dn_split(dn)
+        try:
+            expected_boot_policy = _boot_policy_expected_get(name, org_dn,
+                                                             devices)
+            diff = _boot_policy_device_diff(existing_boot_policy,
+                                            expected_boot_policy)
+            staged = _boot_policy_diff_stage(handle, existing_boot_policy,
+                                             expected_boot_policy, diff)
+        except Exception as err:
+            # one bad policy must not stop the run or leave half of its
+            # changes for the next commit
+            _boot_policy_staged_discard(handle, dn)
+            result["failed"][dn] = str(err)
+            continue
+
+        if not staged:
+            result["skipped"].append(dn)
+            continue
+
+        staged_dns.append(dn)
+        if len(staged_dns) >= batch_size:
+            _boot_policy_stage_commit(handle, staged_dns, result, dry_run)
+            staged_dns = []
+
+    if staged_dns:
+        _boot_policy_stage_commit(handle, staged_dns, result, dry_run)
+    return result
+
+
+def _boot_policy_resolve(org_dn, name, boot_policy_dns):
+    # UCSM looks up a policy name from the org of the consumer up to
+    # org-root and falls back to the default policy
+    for policy_name in [name, "default"]:
+        org = org_dn
+        while org:
+            dn = org + "/boot-policy-" + policy_name
+            if dn in boot_policy_dns:
+                return dn
+            org = org.rsplit("/", 1)[0] if "/" in org else None
+    return None
+
+
+def _boot_policy_consumers_get(handle):
+    class_mos = handle.query_classids("LsServer", "LsbootPolicy")
+    boot_policy_dns = set(mo.dn for mo in class_mos.get("LsbootPolicy", []))
+
+    consumers = {}
+    for sp in class_mos.get("LsServer", []):
+        if "template" in (sp.type or ""):
+            continue
+        if sp.oper_boot_policy_name:
+            dn = sp.oper_boot_policy_name
+        else:
+            # without a policy name UCSM uses the default boot policy
+            dn = _boot_policy_resolve(sp.dn.rsplit("/", 1)[0],
+                                      sp.boot_policy_name or "default",
+                                      boot_policy_dns)
+        if dn:
+            consumers.setdefault(dn, []).append(sp.dn)
+
+    for sp_dns in consumers.values():
+        sp_dns.sort()
+    return consumers
+
+
+class BootPolicyConsumers(InventoryCache):
+    """
+    Cached reverse index from boot policy dn to the service profiles using
+    it, see boot_policy_consumers().
+
+    Args:
+        handle (UcsHandle)
+        ttl (int): seconds after which the index is rebuilt, None to keep it
+         until invalidated
+
+    Example:
+        consumers = BootPolicyConsumers(handle)
+        consumers.watch()
+        sp_dns = boot_policy_consumers(handle, cache=consumers).get(
+                    "org-root/boot-policy-sample_boot", [])
+    """
+
+    watch_class_ids = ("LsServer", "LsbootPolicy")
+
+    def _load(self):
+        return _boot_policy_consumers_get(self.handle)
+
+
+def boot_policy_consumers(handle, cache=None):
+    """
+    maps every boot policy to the service profiles using it
+
+    Service profiles and boot policies are read with a single query. The
+    boot policy of a service profile is the resolved one reported by UCSM,
+    or else its boot policy name looked up from the org of the service
+    profile up to org-root. Service profile templates are left out.
+
+    Args:
+        handle (UcsHandle)
+        cache (BootPolicyConsumers): answers from this cache instead of
+         querying UCSM
+
+    Returns:
+        dict: {boot policy dn: [service profile dn, ...]}
+
+    Example:
+        sp_dns = boot_policy_consumers(handle).get(
+                    "org-root/boot-policy-sample_boot", [])
+    """
+    if cache is not None:
+        return cache.get()
+    return _boot_policy_consumers_get(handle)
+
+
+def _paths_sorted(mo):
+    # primary paths have to be added before secondary ones
+    return sorted(mo.child, key=lambda child: child.type or "")
+
+
+def _device_spec_get(device_name, mo):
+    # turns a device subtree into entries of the devices list format
+    device = {"device_name": device_name, "device_order": mo.order}
+    if device_name == "local_lun":
+        return [dict(device, lun_name=path.lun_name, type=path.type)
+                for path in _paths_sorted(mo)] or [device]
+    elif device_name == "local_jbod":
+        return [dict(device, slot_number=path.slot_number)
+                for path in mo.child[:1]] or [device]
+    elif device_name == "embedded_disk":
+        return [dict(device, slot_number=path.slot_number, type=path.type)
+                for path in _paths_sorted(mo)] or [device]
+    elif device_name == "lan":
+        return [dict(device, vnic_name=path.vnic_name)
+                for path in _paths_sorted(mo)]
+    elif device_name == "iscsi":
+        return [dict(device, vnic_name=path.i_scsi_vnic_name)
+                for path in _paths_sorted(mo)]
+    elif device_name == "san":
+        devices = []
+        for image in _paths_sorted(mo):
+            image_device = dict(device, vnic_name=image.vnic_name,
+                                type=image.type)
+            devices.extend([dict(image_device, target_type=target.type,
+                                 wwn=target.wwn, lun=target.lun)
+                            for target in _paths_sorted(image)] or
+                           [image_device])
+        return devices or [device]
+    return [device]
+
+
+# LsbootPolicy properties carried by boot_policy_export/import
+_boot_policy_export_props = ["reboot_on_update", "enforce_vnic_name",
+                             "boot_mode", "policy_owner", "descr"]
+
+
+def _boot_policy_doc_get(boot_policy):
+    name, org_dn = _boot_policy_dn_split(boot_policy.dn)
+    doc = {"name": name, "org_dn": org_dn}
+    for prop in _boot_policy_export_props:
+        doc[prop] = getattr(boot_policy, prop, None)
+
+    bp_devices = _extract_device_from_bp_child(boot_policy.child)
+    devices = []
+    for device_name, mo in bp_devices.items():
+        devices.extend(_device_spec_get(device_name, mo))
+    doc["devices"] = sorted(devices, key=lambda device: (
+        int(device["device_order"]), device["device_name"]))
+    return doc
+
+
+def boot_policy_export(handle, org_dn=None, batch_size=100):
+    """
+    exports boot policies as JSON lines
+
+    Boot policy dns are listed with one class query, the policies and their
+    device trees are then fetched batch by batch, so memory use does not
+    grow with the number of policies.
+
+    Args:
+        handle (UcsHandle)
+        org_dn (string): export only the boot policies below this org,
+         all orgs if None
+        batch_size (int): maximum number of boot policies fetched at once
+
+    Yields:
+        string: one JSON document per boot policy, without newline,
+         {"name": .., "org_dn": .., "reboot_on_update": .., ..,
+          "devices": devices as accepted by boot_policy_order_set}
+
+    Raises:
+        UcsOperationError: if a boot policy contains an unknown device
+
+    Example:
+        with open("boot_policies.jsonl", "w") as f:
+            for line in boot_policy_export(handle):
+                f.write(line + "\\n")
+    """
+    dns = sorted(mo.dn for mo in handle.query_classid("LsbootPolicy")
+                 if not org_dn or mo.dn.startswith(org_dn + "/"))
+    for batch in chunks(dns, batch_size):
+        boot_policies = dict((mo.dn, mo)
+                             for mo in _boot_policy_trees_get(
+                                 handle, batch, use_cache=False))
+        for dn in batch:
+            if dn not in boot_policies:
+                continue
+            yield json.dumps(_boot_policy_doc_get(boot_policies[dn]),
+                             sort_keys=True, separators=(",", ":"))
+
+
+def _boot_policy_import_stage(handle, doc, existing_boot_policy):
+    # stages one exported boot policy, returns the number of MOs staged
+    LsbootPolicy = mo_class_get("LsbootPolicy")
+
+    name = doc["name"]
+    org_dn = doc.get("org_dn", "org-root")
+    props = dict((prop, doc[prop]) for prop in _boot_policy_export_props
+                 if doc.get(prop) is not None)
+
+    # build every MO before touching the commit buffer, so a bad document
+    # leaves nothing staged behind
+    expected_boot_policy = _boot_policy_expected_get(name, org_dn,
+                                                     doc["devices"])
+    if existing_boot_policy is None:
+        expected_boot_policy.set_prop_multiple(**props)
+        handle.add_mo(expected_boot_policy, modify_present=True)
+        return 1
+
+    props_boot_policy = None
+    if not existing_boot_policy.check_prop_match(**props):
+        props_boot_policy = LsbootPolicy(parent_mo_or_dn=org_dn, name=name,
+                                         **props)
+    diff = _boot_policy_device_diff(existing_boot_policy,
+                                    expected_boot_policy)
+
+    staged = _boot_policy_diff_stage(handle, existing_boot_policy,
+                                     expected_boot_policy, diff)
+    if props_boot_policy is not None:
+        handle.add_mo(props_boot_policy, modify_present=True)
+        staged += 1
+    return staged
+
+
+def _boot_policy_import_batch(handle, docs, result):
+    existing_boot_policies = dict(
+        (mo.dn, mo) for mo in _boot_policy_trees_get(handle, list(docs),
+                                                     use_cache=False))
+
+    staged_dns = []
+    for dn, doc in docs.items():
+        try:
+            staged = _boot_policy_import_stage(
+                handle, doc, existing_boot_policies.get(dn))
+        except (UcsOperationError, KeyError, ValueError) as err:
+            _boot_policy_staged_discard(handle, dn)
+            result["failed"][dn] = str(err)
+            continue
+        if staged:
+            staged_dns.append(dn)
+        else:
+            result["skipped"].append(dn)
+
+    if staged_dns:
+        _boot_policy_stage_commit(handle, staged_dns, result)
+
+
+def boot_policy_import(handle, stream, batch_size=100):
+    """
+    creates or updates boot policies from JSON lines
+
+    The stream is consumed lazily; every batch of boot policies is fetched
+    with one query, only the differences are staged and committed at once.
+
+    Args:
+        handle (UcsHandle)
+        stream (iterable): JSON lines as produced by boot_policy_export,
+         e.g. an open file, blank lines are ignored
+        batch_size (int): maximum number of boot policies per commit
+
+    Returns:
+        dict: {"changed": [boot policy dn, ...],
+               "skipped": [boot policy dn already up to date, ...],
+               "failed": {boot policy dn or line number: error message}}
+
+    Example:
+        with open("boot_policies.jsonl") as f:
+            boot_policy_import(handle, f)
+    """
+    result = {"changed": [], "skipped": [], "failed": {}}
+    docs = {}
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+            dn = doc.get("org_dn", "org-root") + "/boot-policy-" + \
+                doc["name"]
+        except (ValueError, KeyError, AttributeError, TypeError) as err:
+            result["failed"][line_number] = str(err)
+            continue
+        docs[dn] = doc
+        if len(docs) >= batch_size:
+            _boot_policy_import_batch(handle, docs, result)
+            docs = {}
+
+    if docs:
+        _boot_policy_import_batch(handle, docs, result)
+    return result
+
+
+def boot_security_state_all(handle):
+    """
+    gets the boot security state of all boot policies from one class query
+
+    Boot policies without a boot-security child are not listed.
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        dict: {boot policy dn: secure_boot ("yes"/"no")}
+
+    Example:
+        states = boot_security_state_all(handle)
+    """
+    return dict((mo.dn.rsplit("/", 1)[0], mo.secure_boot)
+                for mo in handle.query_classid("LsbootBootSecurity"))
+
+
+def boot_security_set_bulk(handle, policy_refs, secure_boot="yes",
+                           batch_size=100, dry_run=False):
+    """
+    enables or disables boot security of many boot policies
+
+    Boot policies and their boot security are read with one query, only the
+    policies not in the requested state are changed, one boot-security
+    child per policy and one commit per batch. The resulting state is read
+    back with one LsbootBootSecurity class query.
+
+    Args:
+        handle (UcsHandle)
+        policy_refs (list): boot policies to act upon, each entry is either
+         a dict with keys name and optionally org_dn, or a boot policy dn
+        secure_boot (string): "yes" or "no"
+        batch_size (int): maximum number of boot policies per commit
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"changed": [boot policy dn, ...],
+               "skipped": [boot policy dn already in this state, ...],
+               "failed": {boot policy dn: error message, ...},
+               "secure_boot": {boot policy dn: state read back, None if
+                               the policy has no boot security}}
+
+    Raises:
+        UcsOperationError: if a policy_refs entry is missing mandatory keys
+
+    Example:
+        boot_security_set_bulk(handle,
+                               [{"name": "uefi_boot"},
+                                "org-root/org-hr/boot-policy-uefi_hr"],
+                               secure_boot="yes")
+    """
+    dns = []
+    for policy_ref in policy_refs:
+        dn = _boot_policy_ref_dn_get(policy_ref,
+                                     caller="boot_security_set_bulk")
+        if dn not in dns:
+            dns.append(dn)
+
+    result = {"changed": [], "skipped": [], "failed": {}, "secure_boot": {}}
+    if not dns:
+        return result
+
+    class_mos = handle.query_classids("LsbootPolicy", "LsbootBootSecurity")
+    boot_policies = dict((mo.dn, mo)
+                         for mo in class_mos.get("LsbootPolicy", []))
+    states = dict((mo.dn.rsplit("/", 1)[0], mo.secure_boot)
+                  for mo in class_mos.get("LsbootBootSecurity", []))
+
+    staged_dns = []
+    for dn in dns:
+        boot_policy = boot_policies.get(dn)
+        if boot_policy is None:
+            result["failed"][dn] = str(UcsOperationError(
+                "boot_security_set_bulk",
+                "BootPolicy '%s' does not exist" % dn))
+            continue
+        error = _boot_security_precondition_error(boot_policy)
+        if error:
+            result["failed"][dn] = str(UcsOperationError(
+                "boot_security_set_bulk", error))
+            continue
+        if states.get(dn) == secure_boot:
+            result["skipped"].append(dn)
+            continue
+
+        _boot_security_stage(handle, dn, secure_boot)
+        staged_dns.append(dn)
+        if len(staged_dns) >= batch_size:
+            _boot_policy_stage_commit(handle, staged_dns, result, dry_run)
+            staged_dns = []
+
+    if staged_dns:
+        _boot_policy_stage_commit(handle, staged_dns, result, dry_run)
 
-    return True, boot_policy
+    if not dry_run and result["changed"]:
+        states = boot_security_state_all(handle)
+    result["secure_boot"] = dict((dn, states.get(dn)) for dn in dns)
+    return result
@@ -11,12 +11,45 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+import threading
+import time
+import weakref
+
 from ..utils.utils import blade_dn_get
 from ..utils.utils import rack_dn_get
+from ..utils.utils import chunks
+from ..utils.utils import commit
+from ..utils.utils import commit_dry_run
+from ..utils.fleet import fleet_run
+from ucsmsdk.ucsexception import UcsException
 from ucsmsdk.ucsexception import UcsOperationError
+from ucsmsdk.ucseventhandler import UcsEventHandle
 from ucsmsdk.mometa.ls.LsPower import LsPower
 from ucsmsdk.mometa.ls.LsPower import LsPowerConsts
 
+# oper_power reported by ComputeBlade/ComputeRackUnit once a LsPower state
+# has been applied
+_oper_power_map = {
+    LsPowerConsts.STATE_UP: "on",
+    LsPowerConsts.STATE_DOWN: "off",
+}
+
+# polling interval used when the event channel is not available
+_power_wait_poll_sec = 10
+# while subscribed to events, pending servers are re-read at this interval
+# in case an event was missed
+_power_wait_recheck_sec = 60
+
+# server class watched by the power waits, by dn prefix
+_power_wait_class_ids = (("sys/chassis-", "ComputeBlade"),
+                         ("sys/rack-unit-", "ComputeRackUnit"))
+
+# handle -> UcsEventHandle shared by all power waits on that handle, so
+# repeated waits reuse one event subscription
+_power_event_handles = weakref.WeakKeyDictionary()
+_power_event_handles_lock = threading.Lock()
+
 
 def _server_dn_get(chassis_id=None, blade_id=None, rack_id=None):
     if chassis_id and blade_id:
@@ -31,50 +64,173 @@ def _server_dn_get(chassis_id=None, blade_id=None, rack_id=None):
     return dn
 
 
+def _server_association_error(dn, server_mo):
+    if server_mo is None:
+        return "server %s does not exist" % (dn)
+
+    if not server_mo.assigned_to_dn:
+        return "server %s is not associated to a service profile" % (dn)
+
+    if server_mo.association != "associated":
+        return "server %s is still in process of associating a service profile\
+            OR there might be faults.Please wait or check.Current association\
+            state is %s" % (dn, server_mo.association)
+    return None
+
+
+def _server_oper_power_get(state, caller):
+    if state not in _oper_power_map:
+        raise UcsOperationError(
+            caller,
+            "wait is supported only for power states %s" %
+            sorted(_oper_power_map.keys()))
+    return _oper_power_map[state]
+
+
+def _power_watch_add(handle, dns, call_back):
+    # subscribes call_back to change events of the server classes in dns
+    # on the shared event handle, returns the watch blocks added. The event
+    # handle is shared by every wait, so no per-wait timeout is set on it;
+    # _server_power_wait enforces its own deadline and removes the blocks.
+    with _power_event_handles_lock:
+        event_handle = _power_event_handles.get(handle)
+        if event_handle is None:
+            event_handle = UcsEventHandle(handle)
+            _power_event_handles[handle] = event_handle
+        watch_blocks = []
+        for prefix, class_id in _power_wait_class_ids:
+            if not any(dn.startswith(prefix) for dn in dns):
+                continue
+            watch_block = event_handle.add(class_id=class_id,
+                                           call_back=call_back)
+            if watch_block:
+                watch_blocks.append(watch_block)
+    return event_handle, watch_blocks
+
+
+def _power_watch_remove(event_handle, watch_blocks):
+    with _power_event_handles_lock:
+        for watch_block in watch_blocks:
+            event_handle.remove(watch_block)
+
+
+def _server_power_wait(handle, dns, oper_power, timeout=None):
+    """
+    waits until every server in dns reports the given oper_power and
+    returns the dns which did not get there before the timeout
+
+    ComputeBlade/ComputeRackUnit change events are consumed from the UCSM
+    event channel, through one event handle per UcsHandle. The servers are
+    only polled if the subscription can not be set up, plus a periodic
+    recheck for events that might have been missed.
+    """
+    pending = set(dns)
+    server_dns = frozenset(dns)
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def _pending_discard(dns_reached):
+        with lock:
+            pending.difference_update(dns_reached)
+            if not pending:
+                done.set()
+
+    def _event_cb(mce):
+        if mce.mo.dn in server_dns and \
+                getattr(mce.mo, "oper_power", None) == oper_power:
+            _pending_discard([mce.mo.dn])
+
+    def _pending_poll():
+        with lock:
+            dns_to_check = list(pending)
+        if not dns_to_check:
+            return
+        server_mos = handle.query_dns(dns_to_check)
+        _pending_discard([dn for dn, mo in server_mos.items()
+                          if mo is not None and mo.oper_power == oper_power])
+
+    event_handle, watch_blocks = _power_watch_add(handle, dns, _event_cb)
+    interval = _power_wait_recheck_sec if watch_blocks else \
+        _power_wait_poll_sec
+
+    deadline = None if timeout is None else time.time() + timeout
+    try:
+        # catches servers which are already there or got there before the
+        # subscription was in place
+        _pending_poll()
+        while not done.is_set():
+            wait_sec = interval
+            if deadline is not None:
+                wait_sec = min(wait_sec, deadline - time.time())
+                if wait_sec <= 0:
+                    break
+            if not done.wait(wait_sec):
+                _pending_poll()
+    finally:
+        _power_watch_remove(event_handle, watch_blocks)
+
+    with lock:
+        return sorted(pending)
+
+
+def _server_mos_get(handle, dns, resolver=None):
+    if resolver is not None:
+        return resolver.server_mos_get(dns)
+    return handle.query_dns(dns)
+
+
 def _service_profile_power_set(
         handle,
         chassis_id=None,
         blade_id=None,
         rack_id=None,
-        state=None):
+        state=None,
+        wait=False,
+        timeout=None,
+        resolver=None,
+        dry_run=False):
 
     dn = _server_dn_get(
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id)
-    blade_mo = handle.query_dn(dn)
-    if blade_mo is None:
-        raise UcsOperationError(
-            "_service_profile_power_set: Failed to set server power",
-            "server %s does not exist" % (dn))
-
-    if not blade_mo.assigned_to_dn:
-        raise UcsOperationError(
-            "_service_profile_power_set: Failed to set server power",
-            "server %s is not associated to a service profile" % (dn))
-
-    if blade_mo.association != "associated":
+    if resolver is not None:
+        blade_mo = resolver.server_mo_get(dn)
+    else:
+        blade_mo = handle.query_dn(dn)
+    error = _server_association_error(dn, blade_mo)
+    if error:
         raise UcsOperationError(
-            "_service_profile_power_set: Failed to set server power",
-            "server %s is still in process of associating a service profile\
-            OR there might be faults.Please wait or check.Current association\
-            state is %s" % (dn, blade_mo.association))
-
+            "_service_profile_power_set: Failed to set server power", error)
 
-    sp_mo = handle.query_dn(blade_mo.assigned_to_dn)
-    LsPower(
-        parent_mo_or_dn=sp_mo,
+    mo = LsPower(
+        parent_mo_or_dn=blade_mo.assigned_to_dn,
         state=state)
-    handle.set_mo(sp_mo)
-    handle.commit()
-
-
-def server_power_exists(handle, chassis_id=None, blade_id=None, rack_id=None):
+    handle.add_mo(mo, modify_present=True)
+    payload = commit(handle, dry_run)
+    if dry_run:
+        return payload
+
+    if wait:
+        oper_power = _server_oper_power_get(state,
+                                            "_service_profile_power_set")
+        if _server_power_wait(handle, [dn], oper_power, timeout):
+            raise UcsOperationError(
+                "_service_profile_power_set: Failed to set server power",
+                "server %s did not reach power state '%s' within %s seconds"
+                % (dn, oper_power, timeout))
+
+
+def server_power_exists(handle, chassis_id=None, blade_id=None, rack_id=None,
+                        resolver=None):
     dn = _server_dn_get(
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id)
-    blade_mo = handle.query_dn(dn)
+    if resolver is not None:
+        blade_mo = resolver.server_mo_get(dn)
+    else:
+        blade_mo = handle.query_dn(dn)
     if blade_mo is None:
         return False
 
@@ -83,7 +239,53 @@ def server_power_exists(handle, chassis_id=None, blade_id=None, rack_id=None):
     return False
 
 
-def server_power_on(handle, chassis_id=None, blade_id=None, rack_id=None):
+def _server_power_state_get(server_mo):
+    state = {
+        "dn": server_mo.dn,
+        "chassis_id": None,
+        "blade_id": None,
+        "rack_id": None,
+        "oper_power": server_mo.oper_power,
+        "association": server_mo.association,
+        "assigned_to_dn": server_mo.assigned_to_dn,
+    }
+    if server_mo.get_class_id() == "ComputeBlade":
+        state["chassis_id"] = server_mo.chassis_id
+        state["blade_id"] = server_mo.slot_id
+    else:
+        state["rack_id"] = server_mo.id
+    return state
+
+
+def server_power_state_all(handle):
+    """
+    Gets the power and association state of every blade and rack server.
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        list of dict: one entry per server with keys
+         dn, chassis_id, blade_id, rack_id, oper_power, association,
+         assigned_to_dn
+
+    Raises:
+        None
+
+    Example:
+        for server in server_power_state_all(handle):
+            print(server["dn"], server["oper_power"])
+    """
+    class_mos = handle.query_classids("ComputeBlade", "ComputeRackUnit")
+    servers = []
+    for class_id in ["ComputeBlade", "ComputeRackUnit"]:
+        for server_mo in class_mos.get(class_id, []):
+            servers.append(_server_power_state_get(server_mo))
+    return servers
+
+
+def server_power_on(handle, chassis_id=None, blade_id=None, rack_id=None,
+                    wait=False, timeout=None, resolver=None, dry_run=False):
     """
     Power-On the server.
 
@@ -92,26 +294,35 @@ def server_power_on(handle, chassis_id=None, blade_id=None, rack_id=None):
         chassis_id (int): chassis id
         blade_id (int): blade id
         rack_id (int): rack id
+        wait (bool): if True, return only once the server is powered on
+        timeout (int): maximum seconds to wait, None waits indefinitely
+        resolver (ServerResolver): resolves the server without a lookup
+        dry_run (bool): if True, return the request instead of sending it
 
     Returns:
-        None
+        None, or the commit_dry_run() dict if dry_run is True
 
     Raises:
         UcsOperationError
 
     Example:
         server_power_on(handle, chassis_id=1, blade_id=2)
-        server_power_on(handle, rack_id=1)
+        server_power_on(handle, rack_id=1, wait=True, timeout=300)
     """
-    _service_profile_power_set(
+    return _service_profile_power_set(
         handle=handle,
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id,
-        state=LsPowerConsts.STATE_UP)
+        state=LsPowerConsts.STATE_UP,
+        wait=wait,
+        timeout=timeout,
+        resolver=resolver,
+        dry_run=dry_run)
 
 
-def server_power_off(handle, chassis_id=None, blade_id=None, rack_id=None):
+def server_power_off(handle, chassis_id=None, blade_id=None, rack_id=None,
+                     wait=False, timeout=None, resolver=None, dry_run=False):
     """
     Power-Off the server.
 
@@ -120,27 +331,36 @@ def server_power_off(handle, chassis_id=None, blade_id=None, rack_id=None):
         chassis_id (int): chassis id
         blade_id (int): blade id
         rack_id (int): rack id
+        wait (bool): if True, return only once the server is powered off
+        timeout (int): maximum seconds to wait, None waits indefinitely
+        resolver (ServerResolver): resolves the server without a lookup
+        dry_run (bool): if True, return the request instead of sending it
 
     Returns:
-        None
+        None, or the commit_dry_run() dict if dry_run is True
 
     Raises:
         UcsOperationError
 
     Example:
         server_power_off(handle, chassis_id=1, blade_id=2)
-        server_power_off(handle, rack_id=1)
+        server_power_off(handle, rack_id=1, wait=True, timeout=300)
     """
 
-    _service_profile_power_set(
+    return _service_profile_power_set(
         handle=handle,
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id,
-        state=LsPowerConsts.STATE_DOWN)
+        state=LsPowerConsts.STATE_DOWN,
+        wait=wait,
+        timeout=timeout,
+        resolver=resolver,
+        dry_run=dry_run)
 
 
-def server_power_cycle_wait(handle, chassis_id=None, blade_id=None, rack_id=None):
+def server_power_cycle_wait(handle, chassis_id=None, blade_id=None, rack_id=None,
+                            resolver=None, dry_run=False):
     """
     Triggers a graceful OS shutdown and powercycle operation on the specified server.
 
@@ -149,9 +369,11 @@ def server_power_cycle_wait(handle, chassis_id=None, blade_id=None, rack_id=None
         chassis_id (int): chassis id
         blade_id (int): blade id
         rack_id (int): rack id
+        resolver (ServerResolver): resolves the server without a lookup
+        dry_run (bool): if True, return the request instead of sending it
 
     Returns:
-        None
+        None, or the commit_dry_run() dict if dry_run is True
 
     Raises:
         UcsOperationError
@@ -160,15 +382,18 @@ def server_power_cycle_wait(handle, chassis_id=None, blade_id=None, rack_id=None
         server_power_cycle_wait(handle, chassis_id=1, blade_id=2)
         server_power_cycle_wait(handle, rack_id=1)
     """
-    _service_profile_power_set(
+    return _service_profile_power_set(
         handle=handle,
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id,
-        state=LsPowerConsts.STATE_CYCLE_WAIT)
+        state=LsPowerConsts.STATE_CYCLE_WAIT,
+        resolver=resolver,
+        dry_run=dry_run)
 
 
-def server_power_cycle_immediate(handle, chassis_id=None, blade_id=None, rack_id=None):
+def server_power_cycle_immediate(handle, chassis_id=None, blade_id=None, rack_id=None,
+                                 resolver=None, dry_run=False):
     """
     Triggers an immediate powercycle operation on the specified server.
 
@@ -177,9 +402,11 @@ def server_power_cycle_immediate(handle, chassis_id=None, blade_id=None, rack_id
         chassis_id (int): chassis id
         blade_id (int): blade id
         rack_id (int): rack id
+        resolver (ServerResolver): resolves the server without a lookup
+        dry_run (bool): if True, return the request instead of sending it
 
     Returns:
-        None
+        None, or the commit_dry_run() dict if dry_run is True
 
     Raises:
         UcsOperationError
@@ -188,12 +415,403 @@ def server_power_cycle_immediate(handle, chassis_id=None, blade_id=None, rack_id
         server_power_cycle_immediate(handle, chassis_id=1, blade_id=2)
         server_power_cycle_immediate(handle, rack_id=1)
     """
-    _service_profile_power_set(
+    return _service_profile_power_set(
         handle=handle,
         chassis_id=chassis_id,
         blade_id=blade_id,
         rack_id=rack_id,
-        state=LsPowerConsts.STATE_CYCLE_IMMEDIATE)
+        state=LsPowerConsts.STATE_CYCLE_IMMEDIATE,
+        resolver=resolver,
+        dry_run=dry_run)
+
+
+def _server_spec_dn_get(server):
+    if isinstance(server, dict):
+        return _server_dn_get(**server)
+    return server
+
+
+def _server_dns_get(servers):
+    dns = []
+    seen = set()
+    for server in servers:
+        dn = _server_spec_dn_get(server)
+        if dn not in seen:
+            seen.add(dn)
+            dns.append(dn)
+    return dns
+
+
+def _service_profile_power_commit(handle, sp_dns, state, batch_size,
+                                  result, dry_run=False):
+    # sp_dns is a list of (key, service profile dn) tuples, the key is what
+    # gets reported back in the result
+    for batch in chunks(sp_dns, batch_size):
+        for key, sp_dn in batch:
+            mo = LsPower(parent_mo_or_dn=sp_dn, state=state)
+            handle.add_mo(mo, modify_present=True)
+        if dry_run:
+            result.setdefault("dry_run", []).append(commit_dry_run(handle))
+            result["success"].extend([key for key, sp_dn in batch])
+            continue
+        try:
+            handle.commit()
+        except UcsException as err:
+            handle.commit_buffer_discard()
+            for key, sp_dn in batch:
+                result["failed"][key] = str(err)
+            continue
+        result["success"].extend([key for key, sp_dn in batch])
+
+
+def server_power_set_bulk(handle, servers, state, batch_size=100,
+                          wait=False, timeout=None, resolver=None,
+                          dry_run=False):
+    """
+    Sets the power state of many servers using batched lookups and commits.
+
+    Args:
+        handle (UcsHandle)
+        servers (list): servers to act upon, each entry is either a dict
+         with keys (chassis_id, blade_id) or rack_id, or a server dn
+        state (string): LsPower state, e.g. LsPowerConsts.STATE_UP
+        batch_size (int): maximum number of servers per lookup and commit
+        wait (bool): if True, return only once every committed server has
+         reached the power state, valid only for "up" and "down"
+        timeout (int): maximum seconds to wait, None waits indefinitely
+        resolver (ServerResolver): resolves the servers without a lookup
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"success": [server dn, ...],
+               "failed": {server dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if a server entry is missing mandatory keys
+
+    Example:
+        servers = [{"chassis_id": 1, "blade_id": 1},
+                   {"chassis_id": 1, "blade_id": 2},
+                   {"rack_id": 1}]
+        server_power_set_bulk(handle, servers, LsPowerConsts.STATE_UP)
+    """
+    if wait:
+        oper_power = _server_oper_power_get(state, "server_power_set_bulk")
+
+    dns = _server_dns_get(servers)
+
+    result = {"success": [], "failed": {}}
+    for batch in chunks(dns, batch_size):
+        server_mos = _server_mos_get(handle, batch, resolver)
+
+        sp_dns = []
+        for dn in batch:
+            server_mo = server_mos.get(dn)
+            error = _server_association_error(dn, server_mo)
+            if error:
+                result["failed"][dn] = error
+                continue
+            sp_dns.append((dn, server_mo.assigned_to_dn))
+
+        _service_profile_power_commit(handle, sp_dns, state, batch_size,
+                                      result, dry_run)
+
+    if wait and not dry_run and result["success"]:
+        not_reached = _server_power_wait(handle, result["success"],
+                                         oper_power, timeout)
+        for dn in not_reached:
+            result["success"].remove(dn)
+            result["failed"][dn] = "server %s did not reach power state " \
+                "'%s' within %s seconds" % (dn, oper_power, timeout)
+    return result
+
+
+def server_power_ensure(handle, servers, state, batch_size=100, wait=False,
+                        timeout=None, resolver=None, dry_run=False):
+    """
+    Brings servers to the given power state, committing only the servers
+    which are not in that state already.
+
+    Args:
+        handle (UcsHandle)
+        servers (list): servers to act upon, each entry is either a dict
+         with keys (chassis_id, blade_id) or rack_id, or a server dn
+        state (string): LsPowerConsts.STATE_UP or LsPowerConsts.STATE_DOWN
+        batch_size (int): maximum number of servers per lookup and commit
+        wait (bool): if True, return only once every changed server has
+         reached the power state
+        timeout (int): maximum seconds to wait, None waits indefinitely
+        resolver (ServerResolver): resolves the servers without a lookup,
+         note that oper_power is only as fresh as the resolver index
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"changed": [server dn, ...],
+               "skipped": [server dn, ...],
+               "failed": {server dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if state is neither "up" nor "down" or a server
+                           entry is missing mandatory keys
+
+    Example:
+        server_power_ensure(handle, [{"rack_id": 1}, {"rack_id": 2}],
+                            LsPowerConsts.STATE_UP)
+    """
+    oper_power = _server_oper_power_get(state, "server_power_ensure")
+
+    dns = _server_dns_get(servers)
+
+    result = {"changed": [], "skipped": [], "failed": {}}
+    to_commit = []
+    for batch in chunks(dns, batch_size):
+        server_mos = _server_mos_get(handle, batch, resolver)
+        for dn in batch:
+            server_mo = server_mos.get(dn)
+            if server_mo is not None and server_mo.oper_power == oper_power:
+                result["skipped"].append(dn)
+                continue
+            error = _server_association_error(dn, server_mo)
+            if error:
+                result["failed"][dn] = error
+                continue
+            to_commit.append((dn, server_mo.assigned_to_dn))
+
+    commit_result = {"success": [], "failed": result["failed"]}
+    _service_profile_power_commit(handle, to_commit, state, batch_size,
+                                  commit_result, dry_run)
+    result["changed"] = commit_result["success"]
+    if dry_run:
+        result["dry_run"] = commit_result.get("dry_run", [])
+
+    if wait and not dry_run and result["changed"]:
+        not_reached = _server_power_wait(handle, result["changed"],
+                                         oper_power, timeout)
+        for dn in not_reached:
+            result["changed"].remove(dn)
+            result["failed"][dn] = "server %s did not reach power state " \
+                "'%s' within %s seconds" % (dn, oper_power, timeout)
+    return result
+
+
+def _service_profile_association_error(dn, sp_mo):
+    if sp_mo is None:
+        return "service profile %s does not exist" % (dn)
+
+    if not sp_mo.pn_dn:
+        return "service profile %s is not associated to a server" % (dn)
+
+    if sp_mo.assoc_state != "associated":
+        return "service profile %s is still in process of associating a "\
+            "server OR there might be faults. Current association state is "\
+            "%s" % (dn, sp_mo.assoc_state)
+    return None
+
+
+def service_profile_power_set(handle, sp_dns, state, batch_size=100,
+                              wait=False, timeout=None, dry_run=False):
+    """
+    Sets the power state of many service profiles without looking up the
+    servers they are associated to.
+
+    Association is validated from a single LsServer class query.
+
+    Args:
+        handle (UcsHandle)
+        sp_dns (list of string): service profile dns
+        state (string): LsPower state, e.g. LsPowerConsts.STATE_UP
+        batch_size (int): maximum number of service profiles per commit
+        wait (bool): if True, return only once every associated server has
+         reached the power state, valid only for "up" and "down"
+        timeout (int): maximum seconds to wait, None waits indefinitely
+        dry_run (bool): if True, nothing is committed and result["dry_run"]
+         holds the commit_dry_run() dict of every batch
+
+    Returns:
+        dict: {"success": [service profile dn, ...],
+               "failed": {service profile dn: error message, ...}}
+
+    Raises:
+        None
+
+    Example:
+        service_profile_power_set(
+            handle, ["org-root/ls-sp1", "org-root/org-hr/ls-sp2"],
+            LsPowerConsts.STATE_DOWN)
+    """
+    if wait:
+        oper_power = _server_oper_power_get(state, "service_profile_power_set")
+
+    sp_mos = dict((mo.dn, mo) for mo in handle.query_classid("LsServer"))
+
+    result = {"success": [], "failed": {}}
+    to_commit = []
+    seen = set()
+    for dn in sp_dns:
+        if dn in seen:
+            continue
+        seen.add(dn)
+        error = _service_profile_association_error(dn, sp_mos.get(dn))
+        if error:
+            result["failed"][dn] = error
+            continue
+        to_commit.append((dn, dn))
+
+    _service_profile_power_commit(handle, to_commit, state, batch_size,
+                                  result, dry_run)
+
+    if wait and not dry_run and result["success"]:
+        server_dns = dict((sp_mos[dn].pn_dn, dn) for dn in result["success"])
+        not_reached = _server_power_wait(handle, list(server_dns),
+                                         oper_power, timeout)
+        for server_dn in not_reached:
+            dn = server_dns[server_dn]
+            result["success"].remove(dn)
+            result["failed"][dn] = "server %s did not reach power state " \
+                "'%s' within %s seconds" % (server_dn, oper_power, timeout)
+    return result
+
+
+def server_power_set_fleet(pool, domain_servers, state, max_domains=8,
+                           **kwargs):
+    """
+    Sets the power state of servers across many UCSM domains in parallel.
+
+    Every domain is handled by server_power_set_bulk on a handle reused
+    from the pool.
+
+    Args:
+        pool (UcsHandlePool): logged-in handles of the domains
+        domain_servers (dict): {domain: list of servers}, see
+         server_power_set_bulk for the server format
+        state (string): LsPower state, e.g. LsPowerConsts.STATE_UP
+        max_domains (int): number of domains processed concurrently
+        **kwargs: passed to server_power_set_bulk, e.g. batch_size, wait,
+         timeout
+
+    Returns:
+        dict: {domain: {"result": server_power_set_bulk result or None,
+                        "error": error message or None}}
+
+    Raises:
+        None
+
+    Example:
+        pool = UcsHandlePool({"ucsm-01": {"username": "admin",
+                                          "password": "password"}})
+        server_power_set_fleet(pool, {"ucsm-01": [{"rack_id": 1}]},
+                               LsPowerConsts.STATE_UP, max_domains=10)
+    """
+    return fleet_run(pool, domain_servers, server_power_set_bulk,
+                     max_domains=max_domains, state=state, **kwargs)
+
+
+_blade_dn_re = re.compile(r"^sys/chassis-([^/]+)/blade-[^/]+$")
+
+
+def _server_power_waves(dns, max_per_chassis=None, max_per_domain=None):
+    """
+    splits server dns into waves honouring the per chassis and per domain
+    limits, blades are picked round robin across chassis
+    """
+    chassis_queues = {}
+    chassis_order = []
+    racks = []
+    for dn in dns:
+        match = _blade_dn_re.match(dn)
+        if match is None:
+            racks.append(dn)
+            continue
+        chassis_id = match.group(1)
+        if chassis_id not in chassis_queues:
+            chassis_queues[chassis_id] = []
+            chassis_order.append(chassis_id)
+        chassis_queues[chassis_id].append(dn)
+
+    waves = []
+    while racks or any(chassis_queues.values()):
+        wave = []
+        chassis_count = dict((chassis_id, 0) for chassis_id in chassis_order)
+        progress = True
+        while progress:
+            progress = False
+            for chassis_id in chassis_order:
+                if max_per_domain and len(wave) >= max_per_domain:
+                    break
+                if not chassis_queues[chassis_id]:
+                    continue
+                if max_per_chassis and \
+                        chassis_count[chassis_id] >= max_per_chassis:
+                    continue
+                wave.append(chassis_queues[chassis_id].pop(0))
+                chassis_count[chassis_id] += 1
+                progress = True
+        while racks and not (max_per_domain and len(wave) >= max_per_domain):
+            wave.append(racks.pop(0))
+        waves.append(wave)
+    return waves
+
+
+def server_power_on_staggered(handle, servers, max_per_chassis=2,
+                              max_per_domain=None, wave_delay=30,
+                              wait=False, timeout=None, progress_cb=None,
+                              resolver=None):
+    """
+    Powers on servers in waves to limit the inrush current.
+
+    Every wave holds at most 'max_per_chassis' blades of a chassis and at
+    most 'max_per_domain' servers overall, and is applied with a single
+    commit. Rack servers only count against 'max_per_domain'.
+
+    Args:
+        handle (UcsHandle)
+        servers (list): servers to power on, each entry is either a dict
+         with keys (chassis_id, blade_id) or rack_id, or a server dn
+        max_per_chassis (int): blades per chassis in a wave, None for no limit
+        max_per_domain (int): servers in a wave, None for no limit
+        wave_delay (int): seconds to sleep between two waves
+        wait (bool): if True, wait for the servers of a wave to report
+         oper_power "on" before starting the next wave
+        timeout (int): maximum seconds to wait per wave
+        progress_cb (function): called after every wave as
+         progress_cb(wave_index, wave_count, wave_result)
+        resolver (ServerResolver): resolves the servers without a lookup
+
+    Returns:
+        dict: {"success": [server dn, ...],
+               "failed": {server dn: error message, ...}}
+
+    Raises:
+        UcsOperationError: if a server entry is missing mandatory keys
+
+    Example:
+        def progress(index, count, wave_result):
+            print("wave %d/%d done" % (index + 1, count))
+
+        server_power_on_staggered(handle, servers, max_per_chassis=2,
+                                  max_per_domain=16, wave_delay=60,
+                                  progress_cb=progress)
+    """
+    dns = _server_dns_get(servers)
+
+    waves = _server_power_waves(dns, max_per_chassis, max_per_domain)
+    result = {"success": [], "failed": {}}
+    for index, wave in enumerate(waves):
+        if index:
+            time.sleep(wave_delay)
+        wave_result = server_power_set_bulk(handle, wave,
+                                            LsPowerConsts.STATE_UP,
+                                            batch_size=len(wave),
+                                            wait=wait,
+                                            timeout=timeout,
+                                            resolver=resolver)
+        result["success"].extend(wave_result["success"])
+        result["failed"].update(wave_result["failed"])
+        if progress_cb:
+            progress_cb(index, len(waves), wave_result)
+    return result
 
 
 def _server_admin_power_set(
@@ -0,0 +1,112 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a base for client side caches of UCSM inventory which
+are invalidated by a TTL and/or by UCSM change events.
+"""
+import threading
+import time
+
+from ucsmsdk.ucseventhandler import UcsEventHandle
+
+
+class InventoryCache(object):
+    """
+    Base class of a lazily loaded cache of UCSM inventory.
+
+    Subclasses implement _load(), which queries UCSM and returns the cached
+    data. The data is reloaded on first use after it has been invalidated,
+    either explicitly, by the ttl expiring or by a change event for one of
+    the watched class ids.
+
+    Args:
+        handle (UcsHandle)
+        ttl (int): seconds after which the data is reloaded, None to keep it
+         until invalidated
+    """
+
+    # class ids whose change events invalidate the cache when watched
+    watch_class_ids = ()
+
+    def __init__(self, handle, ttl=None):
+        self.handle = handle
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._data = None
+        self._loaded_at = None
+        self._event_handle = None
+        self._watch_block = None
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _is_stale(self):
+        if self._data is None:
+            return True
+        if self.ttl is not None and time.time() - self._loaded_at > self.ttl:
+            return True
+        return False
+
+    def get(self):
+        """
+        returns the cached data, loading it if needed
+        """
+        with self._lock:
+            if self._is_stale():
+                self.refresh()
+            return self._data
+
+    def refresh(self):
+        """
+        reloads the data from UCSM
+        """
+        with self._lock:
+            self._data = self._load()
+            self._loaded_at = time.time()
+
+    def invalidate(self):
+        """
+        drops the data, the next access reloads it
+        """
+        with self._lock:
+            self._data = None
+
+    def _event_cb(self, mce):
+        if mce.mo.get_class_id() in self.watch_class_ids:
+            self.invalidate()
+
+    def watch(self):
+        """
+        subscribes to the UCSM event channel and invalidates the cache on
+        change events of watch_class_ids
+
+        Returns:
+            True if the subscription is in place, False otherwise
+        """
+        with self._lock:
+            if self._watch_block is not None:
+                return True
+            self._event_handle = UcsEventHandle(self.handle)
+            self._watch_block = self._event_handle.add(
+                call_back=self._event_cb)
+            return self._watch_block is not None
+
+    def unwatch(self):
+        """
+        stops invalidating the cache on change events
+        """
+        with self._lock:
+            if self._watch_block is not None:
+                self._event_handle.remove(self._watch_block)
+            self._event_handle = None
+            self._watch_block = None
@@ -0,0 +1,146 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module runs APIs against many UCSM domains in parallel.
+"""
+import threading
+
+from six.moves import queue
+
+from ucsmsdk.ucshandle import UcsHandle
+
+
+class UcsHandlePool(object):
+    """
+    Keeps one logged-in UcsHandle per domain and hands it out for reuse.
+
+    Handles are created and logged in on first use. A domain is never used
+    by two threads at once when going through fleet_run(), so a single
+    handle per domain is enough.
+
+    Args:
+        domains (dict): {domain: {UcsHandle keyword arguments}}, "ip"
+         defaults to the domain name
+
+    Example:
+        pool = UcsHandlePool({
+            "ucsm-01": {"username": "admin", "password": "password"},
+            "ucsm-02": {"ip": "10.1.1.2", "username": "admin",
+                        "password": "password"},
+        })
+    """
+
+    def __init__(self, domains=None):
+        self._domains = dict(domains or {})
+        self._handles = {}
+        self._domain_locks = {}
+        self._lock = threading.Lock()
+
+    def add(self, domain, handle):
+        """
+        registers an already created handle for a domain
+        """
+        with self._lock:
+            self._handles[domain] = handle
+
+    def _domain_lock_get(self, domain):
+        with self._lock:
+            if domain not in self._domain_locks:
+                self._domain_locks[domain] = threading.Lock()
+            return self._domain_locks[domain]
+
+    def get(self, domain):
+        """
+        returns the logged-in handle of a domain
+        """
+        with self._domain_lock_get(domain):
+            handle = self._handles.get(domain)
+            if handle is not None and handle.cookie:
+                return handle
+            if handle is None:
+                if domain not in self._domains:
+                    raise KeyError("Unknown domain '%s'" % domain)
+                params = dict(self._domains[domain])
+                params.setdefault("ip", domain)
+                handle = UcsHandle(**params)
+            handle.login()
+            with self._lock:
+                self._handles[domain] = handle
+            return handle
+
+    def logout_all(self):
+        """
+        logs out every handle of the pool
+        """
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles = {}
+        for handle in handles:
+            if handle.cookie:
+                handle.logout()
+
+
+def fleet_run(pool, domain_args, func, max_domains=8, **kwargs):
+    """
+    Runs func(handle, args, **kwargs) for every domain, at most
+    'max_domains' domains at a time.
+
+    Args:
+        pool (UcsHandlePool): handles of the domains
+        domain_args (dict): {domain: second positional argument of func}
+        func (function): API to run, e.g. server_power_set_bulk
+        max_domains (int): number of domains processed concurrently
+        **kwargs: passed to every func call
+
+    Returns:
+        dict: {domain: {"result": return value of func or None,
+                        "error": error message or None}}
+
+    Example:
+        fleet_run(pool, {"ucsm-01": [{"rack_id": 1}],
+                         "ucsm-02": [{"chassis_id": 1, "blade_id": 1}]},
+                  server_power_set_bulk, state="up")
+    """
+    work = queue.Queue()
+    for domain in domain_args:
+        work.put(domain)
+
+    results = {}
+    results_lock = threading.Lock()
+
+    def _worker():
+        while True:
+            try:
+                domain = work.get_nowait()
+            except queue.Empty:
+                return
+            outcome = {"result": None, "error": None}
+            try:
+                handle = pool.get(domain)
+                outcome["result"] = func(handle, domain_args[domain],
+                                         **kwargs)
+            except Exception as err:
+                outcome["error"] = str(err)
+            with results_lock:
+                results[domain] = outcome
+
+    workers = []
+    for i in range(max(1, min(max_domains, len(domain_args)))):
+        worker = threading.Thread(target=_worker,
+                                  name="ucsm_apis_fleet_%d" % i)
+        worker.daemon = True
+        worker.start()
+        workers.append(worker)
+    for worker in workers:
+        worker.join()
+    return results
@@ -0,0 +1,49 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a lazy registry of the ucsmsdk mometa classes.
+"""
+from ucsmsdk.ucscoreutils import load_class
+
+# class id -> mometa class, filled on first use of every class id
+_mo_classes = {}
+
+
+def mo_class_get(class_id):
+    """
+    returns the mometa class of a class id, the module is imported on first
+    use only and the class is served from the registry afterwards
+
+    Args:
+        class_id (string): class id, e.g. "LsbootPolicy"
+
+    Returns:
+        ManagedObject class
+
+    Raises:
+        ValueError: if class_id is not a known mometa class
+
+    Example:
+        LsbootPolicy = mo_class_get("LsbootPolicy")
+        mo = LsbootPolicy(parent_mo_or_dn="org-root", name="sample_boot")
+    """
+    try:
+        return _mo_classes[class_id]
+    except KeyError:
+        pass
+
+    mo_class = load_class(class_id)
+    if mo_class is None:
+        raise ValueError("Unknown class id '%s'" % class_id)
+    _mo_classes[class_id] = mo_class
+    return mo_class
@@ -0,0 +1,82 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+This module provides a cached resolver of server dns.
+"""
+from .cache import InventoryCache
+from .utils import blade_dn_get
+from .utils import rack_dn_get
+
+
+class ServerResolver(InventoryCache):
+    """
+    Resolves (chassis_id, blade_id) or rack_id to the server, its assigned
+    service profile and association state from a single inventory query.
+
+    The index is rebuilt from one ComputeBlade/ComputeRackUnit query on
+    first use after the ttl expired or after invalidation. Call watch() to
+    invalidate it on server and service profile change events.
+
+    Args:
+        handle (UcsHandle)
+        ttl (int): seconds after which the index is rebuilt, None to keep it
+         until invalidated
+
+    Example:
+        resolver = ServerResolver(handle, ttl=300)
+        resolver.watch()
+        server_power_on(handle, chassis_id=1, blade_id=2, resolver=resolver)
+    """
+
+    watch_class_ids = ("ComputeBlade", "ComputeRackUnit", "LsServer")
+
+    def _load(self):
+        class_mos = self.handle.query_classids("ComputeBlade",
+                                               "ComputeRackUnit")
+        index = {}
+        for class_id in ["ComputeBlade", "ComputeRackUnit"]:
+            for server_mo in class_mos.get(class_id, []):
+                index[server_mo.dn] = server_mo
+        return index
+
+    def server_mo_get(self, dn):
+        """
+        returns the ComputeBlade/ComputeRackUnit MO of a server dn or None
+        """
+        return self.get().get(dn)
+
+    def server_get(self, chassis_id=None, blade_id=None, rack_id=None):
+        """
+        returns the ComputeBlade/ComputeRackUnit MO for the given ids or None
+        """
+        if chassis_id and blade_id:
+            dn = blade_dn_get(chassis_id, blade_id)
+        else:
+            dn = rack_dn_get(rack_id)
+        return self.server_mo_get(dn)
+
+    def service_profile_dn_get(self, dn):
+        """
+        returns the dn of the service profile assigned to a server or None
+        """
+        server_mo = self.server_mo_get(dn)
+        if server_mo is None or not server_mo.assigned_to_dn:
+            return None
+        return server_mo.assigned_to_dn
+
+    def server_mos_get(self, dns):
+        """
+        returns {dn: MO or None} for the given server dns
+        """
+        index = self.get()
+        return dict((dn, index.get(dn)) for dn in dns)
@@ -18,3 +18,94 @@ def blade_dn_get(chassis_id, blade_id):
 
 def rack_dn_get(rack_id):
     return "sys/rack-unit-" + str(rack_id)
+
+
+def chunks(items, size):
+    """
+    splits a list into consecutive sub lists of at most 'size' items
+
+    Args:
+        items (list): items to split
+        size (int): maximum number of items per sub list
+
+    Returns:
+        generator of lists
+
+    Example:
+        for batch in chunks(dns, 100):
+            handle.query_dns(batch)
+    """
+    if not size or size < 1:
+        raise ValueError("chunk size must be a positive integer")
+    items = list(items)
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def _mo_tree_count(mo):
+    return 1 + sum(_mo_tree_count(child) for child in mo.child)
+
+
+# stands in for the session cookie, dry run payloads are meant to be
+# logged and reviewed and must not carry a usable session token
+_dry_run_cookie = "dry-run"
+
+
+def commit_dry_run(handle, tag=None):
+    """
+    builds the configConfMos request handle.commit() would send for the
+    current commit buffer, without sending it, and discards the buffer
+
+    The session cookie in the request is replaced by a placeholder.
+
+    Args:
+        handle (UcsHandle)
+        tag (string): commit buffer tag, as for handle.commit()
+
+    Returns:
+        dict: {"xml": request xml string,
+               "size": request size in bytes,
+               "mo_count": number of MOs in the request}
+
+    Example:
+        handle.add_mo(mo)
+        payload = commit_dry_run(handle)
+    """
+    from ucsmsdk.ucsbasetype import ConfigMap, Pair
+    from ucsmsdk.ucsmethodfactory import config_conf_mos
+    from ucsmsdk import ucsxmlcodec as xc
+
+    # ucsmsdk has no public accessor for the commit buffer, this relies on
+    # the private one and resolves the tag the way handle.commit() does,
+    # so tagged and per thread buffers are previewed as well
+    tag = handle._auto_set_tag_context(tag)
+    mo_dict = handle._get_commit_buf(tag)
+    config_map = ConfigMap()
+    mo_count = 0
+    for mo_dn, mo in mo_dict.items():
+        pair = Pair()
+        pair.key = mo_dn
+        pair.child_add(mo)
+        config_map.child_add(pair)
+        mo_count += _mo_tree_count(mo)
+
+    elem = config_conf_mos(_dry_run_cookie, config_map, False)
+    xml_str = xc.to_xml_str(elem)
+    handle.commit_buffer_discard(tag)
+    return {"xml": xml_str.decode("utf-8") if isinstance(xml_str, bytes)
+            else xml_str,
+            "size": len(xml_str),
+            "mo_count": mo_count}
+
+
+def commit(handle, dry_run=False, tag=None):
+    """
+    commits the commit buffer, or with dry_run returns the request instead
+
+    Returns:
+        None, or the commit_dry_run() dict if dry_run is True
+    """
+    if dry_run:
+        return commit_dry_run(handle, tag)
+    handle.commit(tag=tag)
+    return None